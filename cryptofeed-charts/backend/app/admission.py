@@ -0,0 +1,190 @@
+"""
+Admission control and send fairness for the streaming endpoints.
+Caps concurrent streams globally and per client IP, rate-limits /candles with
+token buckets (per IP, plus a global one in front of the Binance REST
+fallback), and paces each stream's sends so an IP holding many sockets gets
+the same share of the serving loop as an IP holding one.
+"""
+import asyncio
+import ipaddress
+import os
+import time
+from typing import Dict, List
+
+from starlette.requests import HTTPConnection
+
+MAX_CONNECTIONS = int(os.environ.get("MAX_CONNECTIONS", "2000"))
+MAX_CONNECTIONS_PER_IP = int(os.environ.get("MAX_CONNECTIONS_PER_IP", "20"))
+RETRY_AFTER = 10  # seconds suggested to rejected streams
+
+# Peers (IPs or CIDRs) whose Fly-Client-IP / X-Forwarded-For headers are
+# believed; from anyone else those headers are client-controlled.
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(net.strip(), strict=False)
+    for net in os.environ.get("TRUSTED_PROXIES", "").split(",")
+    if net.strip()
+]
+
+CANDLES_RATE = float(os.environ.get("CANDLES_RATE", "5"))      # requests/s per IP
+CANDLES_BURST = float(os.environ.get("CANDLES_BURST", "20"))
+REST_FALLBACK_RATE = 10.0  # Binance klines calls/s for the whole instance
+REST_FALLBACK_BURST = 40.0
+MAX_BUCKETS = 10_000
+
+# Frames one stream may send back-to-back before yielding to the loop when
+# its IP has a single connection; split across an IP's connections.
+SEND_QUANTUM = 16
+
+
+def _trusted(ip: str) -> bool:
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(addr in net for net in TRUSTED_PROXIES)
+
+
+def client_ip(conn: HTTPConnection) -> str:
+    """The peer address, unless the peer is a trusted proxy: then Fly's
+    Fly-Client-IP, else the nearest untrusted X-Forwarded-For hop."""
+    peer = conn.client.host if conn.client else "unknown"
+    if not _trusted(peer):
+        return peer
+    ip = conn.headers.get("fly-client-ip", "").strip()
+    if ip:
+        return ip
+    hops: List[str] = [hop.strip() for hop in conn.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+class Rejected(Exception):
+    """Stream refused; `status` is the HTTP status for SSE, `code` the WS close code."""
+
+    def __init__(self, status: int, code: int, reason: str, retry_after: int = RETRY_AFTER):
+        super().__init__(reason)
+        self.status = status
+        self.code = code
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def close_reason(self) -> str:
+        return f"{self.reason}; retry_after={self.retry_after}"
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost: float = 1.0) -> float:
+        """0 if the request may proceed, else seconds until it could."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    @property
+    def idle(self) -> bool:
+        return self.tokens + (time.monotonic() - self.updated) * self.rate >= self.burst
+
+
+class Ticket:
+    """One admitted stream. pace() after each send; release() when done
+    (idempotent)."""
+
+    __slots__ = ("_admission", "ip", "_sent", "_released")
+
+    def __init__(self, admission: "Admission", ip: str):
+        self._admission = admission
+        self.ip = ip
+        self._sent = 0
+        self._released = False
+
+    async def pace(self):
+        # Queue gets and socket sends often complete without suspending, so a
+        # backlogged stream would otherwise drain its whole queue in one go.
+        self._sent += 1
+        quantum = max(1, SEND_QUANTUM // self._admission.per_ip.get(self.ip, 1))
+        if self._sent >= quantum:
+            self._sent = 0
+            await asyncio.sleep(0)
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._admission._release(self.ip)
+
+
+class Admission:
+    def __init__(self):
+        self.total = 0
+        self.per_ip: Dict[str, int] = {}
+        self.rejected = {"global": 0, "per_ip": 0, "candles": 0, "rest_fallback": 0}
+        self._candle_buckets: Dict[str, TokenBucket] = {}
+        self.rest_fallback = TokenBucket(REST_FALLBACK_RATE, REST_FALLBACK_BURST)
+
+    def admit(self, conn: HTTPConnection) -> Ticket:
+        """Raises Rejected when a cap is reached."""
+        ip = client_ip(conn)
+        if self.total >= MAX_CONNECTIONS:
+            self.rejected["global"] += 1
+            raise Rejected(503, 1013, "server at connection capacity")
+        if self.per_ip.get(ip, 0) >= MAX_CONNECTIONS_PER_IP:
+            self.rejected["per_ip"] += 1
+            raise Rejected(429, 4429, "too many connections from this address")
+        self.total += 1
+        self.per_ip[ip] = self.per_ip.get(ip, 0) + 1
+        return Ticket(self, ip)
+
+    def _release(self, ip: str):
+        self.total -= 1
+        count = self.per_ip.get(ip, 0) - 1
+        if count > 0:
+            self.per_ip[ip] = count
+        else:
+            self.per_ip.pop(ip, None)
+
+    def candles_wait(self, conn: HTTPConnection) -> float:
+        """Per-IP /candles budget: 0 to proceed, else seconds to wait."""
+        ip = client_ip(conn)
+        bucket = self._candle_buckets.get(ip)
+        if bucket is None:
+            if len(self._candle_buckets) >= MAX_BUCKETS:
+                self._candle_buckets = {k: b for k, b in self._candle_buckets.items() if not b.idle}
+            bucket = self._candle_buckets[ip] = TokenBucket(CANDLES_RATE, CANDLES_BURST)
+        wait = bucket.take()
+        if wait:
+            self.rejected["candles"] += 1
+        return wait
+
+    def rest_fallback_wait(self) -> float:
+        wait = self.rest_fallback.take()
+        if wait:
+            self.rejected["rest_fallback"] += 1
+        return wait
+
+    def report(self) -> dict:
+        busiest = sorted(self.per_ip.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        return {
+            "connections": self.total,
+            "max_connections": MAX_CONNECTIONS,
+            "max_per_ip": MAX_CONNECTIONS_PER_IP,
+            "addresses": len(self.per_ip),
+            "busiest": dict(busiest),
+            "rejected": dict(self.rejected),
+        }
+
+
+# Global admission state — shared by the WS and SSE routers
+admission = Admission()
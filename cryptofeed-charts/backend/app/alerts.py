@@ -0,0 +1,353 @@
+"""
+Server-side alert rules evaluated against the live stream.
+Rules are crossings on a per-coin metric (price, spread, funding, liquidation
+notional over a window). Thresholds are kept sorted per (coin, metric) and
+direction, so an update from prev to value only bisects for the thresholds in
+between instead of scanning every rule. Triggers go out on the coin's "alert"
+channel and, for rules with a webhook, through a bounded delivery queue.
+Webhook URLs must be http(s) and resolve to public addresses only, checked
+when the rule is added and again before every delivery.
+"""
+import asyncio
+import ipaddress
+import itertools
+import logging
+import math
+import secrets
+import socket
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .store import COINS, store
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("price", "spread", "funding", "liq_notional")
+MAX_RULES_PER_COIN = 10_000
+MAX_RULES_PER_CLIENT = 100  # live rules per client address (admin-created rules are exempt)
+MAX_LIQ_WINDOW = 3600
+WEBHOOK_QUEUE_SIZE = 1000
+WEBHOOK_TIMEOUT = 5.0
+
+
+async def check_webhook(url: str):
+    """Raises ValueError unless `url` is http(s) and every address its host
+    resolves to is public (no loopback, private, link-local or metadata)."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("webhook must be an http(s) URL")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except (OSError, ValueError):
+        raise ValueError("webhook host does not resolve")
+    for *_, sockaddr in infos:
+        ip = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            raise ValueError("webhook must resolve to a public address")
+
+
+class Rule:
+    __slots__ = ("id", "coin", "metric", "op", "threshold", "window", "once", "webhook", "note", "created", "secret", "owner")
+
+    def __init__(self, id: int, coin: str, metric: str, op: str, threshold: float, window: int = 0,
+                 once: bool = True, webhook: Optional[str] = None, note: Optional[str] = None,
+                 owner: Optional[str] = None):
+        self.id = id
+        self.coin = coin
+        self.metric = metric
+        self.op = op  # "above": fires when the value rises to the threshold; "below": falls to it
+        self.threshold = threshold
+        self.window = window  # seconds, liq_notional only
+        self.once = once
+        self.webhook = webhook
+        self.note = note
+        self.created = int(time.time() * 1000)
+        self.secret = secrets.token_urlsafe(16)  # returned once on creation; needed to delete
+        self.owner = owner  # client address counted against MAX_RULES_PER_CLIENT
+
+    @property
+    def series(self) -> str:
+        return f"liq_notional:{self.window}" if self.metric == "liq_notional" else self.metric
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "coin": self.coin,
+            "metric": self.metric,
+            "op": self.op,
+            "threshold": self.threshold,
+            "window": self.window,
+            "once": self.once,
+            "webhook": self.webhook,
+            "note": self.note,
+            "created": self.created,
+        }
+
+
+class CrossingIndex:
+    """Sorted (threshold, rule id) lists for one (coin, series)."""
+
+    def __init__(self):
+        self.above: List[Tuple[float, int]] = []
+        self.below: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.above) + len(self.below)
+
+    def add(self, rule: Rule):
+        insort(self.above if rule.op == "above" else self.below, (rule.threshold, rule.id))
+
+    def remove(self, rule: Rule):
+        side = self.above if rule.op == "above" else self.below
+        i = bisect_left(side, (rule.threshold, rule.id))
+        if i < len(side) and side[i][1] == rule.id:
+            del side[i]
+
+    def crossed(self, prev: float, value: float) -> List[int]:
+        """Rule ids with prev < threshold <= value (above) or
+        value <= threshold < prev (below)."""
+        if value > prev:
+            lo = bisect_right(self.above, (prev, float("inf")))
+            hi = bisect_right(self.above, (value, float("inf")))
+            return [rule_id for _, rule_id in self.above[lo:hi]]
+        if value < prev:
+            lo = bisect_left(self.below, (value, -1))
+            hi = bisect_left(self.below, (prev, -1))
+            return [rule_id for _, rule_id in self.below[lo:hi]]
+        return []
+
+
+def _holds(rule: Rule, value: float) -> bool:
+    return value >= rule.threshold if rule.op == "above" else value <= rule.threshold
+
+
+class AlertEngine:
+    """Rules are added on the serving loop and evaluated on the feed thread;
+    one (re-entrant) lock covers both."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._rules: Dict[int, Rule] = {}
+        self._per_coin: Dict[str, int] = {coin: 0 for coin in COINS}
+        self._per_owner: Dict[str, int] = {}
+        self._index: Dict[Tuple[str, str], CrossingIndex] = {}
+        self._last: Dict[Tuple[str, str], float] = {}
+        # coin -> {window: rule count}; (coin, window) -> (time ms, notional)
+        # within the window, and their sum
+        self._liq_windows: Dict[str, Dict[int, int]] = {coin: {} for coin in COINS}
+        self._liqs: Dict[Tuple[str, int], Deque[Tuple[int, float]]] = {}
+        self._liq_sums: Dict[Tuple[str, int], float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._webhooks: Optional[asyncio.Queue] = None
+        self.fired = 0
+        self.webhooks_dropped = 0
+
+    # ── Rules ────────────────────────────────────────────────
+
+    def add(self, coin: str, metric: str, op: str, threshold: float, window: int = 0,
+            once: bool = True, webhook: Optional[str] = None, note: Optional[str] = None,
+            owner: Optional[str] = None) -> Tuple[Rule, Optional[dict]]:
+        """Register a rule. Raises ValueError on bad input. Returns the rule and,
+        if the condition already holds, the trigger it fired immediately."""
+        if coin not in COINS:
+            raise ValueError("unknown coin")
+        if not math.isfinite(threshold):
+            raise ValueError("threshold must be a finite number")  # NaN would break the sorted index
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+        if op not in ("above", "below"):
+            raise ValueError("op must be 'above' or 'below'")
+        if metric == "liq_notional":
+            if not 1 <= window <= MAX_LIQ_WINDOW:
+                raise ValueError(f"window must be between 1 and {MAX_LIQ_WINDOW} seconds")
+        else:
+            window = 0
+        with self._lock:
+            if self._per_coin[coin] >= MAX_RULES_PER_COIN:
+                raise ValueError(f"at most {MAX_RULES_PER_COIN} rules per coin")
+            if owner is not None and self._per_owner.get(owner, 0) >= MAX_RULES_PER_CLIENT:
+                raise ValueError(f"at most {MAX_RULES_PER_CLIENT} rules per client")
+            rule = Rule(next(self._ids), coin, metric, op, threshold, window, once, webhook, note, owner)
+            key = (coin, rule.series)
+            if metric == "liq_notional":
+                self._open_window(coin, window)
+            current = self._last.get(key)
+            if current is not None and _holds(rule, current):
+                trigger = self._trigger(rule, current)
+                if rule.once:
+                    if metric == "liq_notional":
+                        self._close_window(coin, window)
+                    return rule, trigger
+            else:
+                trigger = None
+            self._rules[rule.id] = rule
+            self._per_coin[coin] += 1
+            if owner is not None:
+                self._per_owner[owner] = self._per_owner.get(owner, 0) + 1
+            index = self._index.get(key)
+            if index is None:
+                index = self._index[key] = CrossingIndex()
+            index.add(rule)
+        return rule, trigger
+
+    def get(self, rule_id: int) -> Optional[Rule]:
+        return self._rules.get(rule_id)
+
+    def remove(self, rule_id: int) -> bool:
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+            if rule is None:
+                return False
+            self._unindex(rule)
+            return True
+
+    def _unindex(self, rule: Rule):
+        self._per_coin[rule.coin] -= 1
+        if rule.owner is not None:
+            count = self._per_owner[rule.owner] - 1
+            if count > 0:
+                self._per_owner[rule.owner] = count
+            else:
+                del self._per_owner[rule.owner]
+        key = (rule.coin, rule.series)
+        index = self._index[key]
+        index.remove(rule)
+        if not index:
+            del self._index[key]
+        if rule.metric == "liq_notional":
+            self._close_window(rule.coin, rule.window)
+
+    def _open_window(self, coin: str, window: int):
+        """Count a rule on a liquidation window; the first one seeds the
+        window from the liquidations already in the store."""
+        windows = self._liq_windows[coin]
+        if window not in windows:
+            cutoff = int(time.time() * 1000) - window * 1000
+            entries = deque((l.time, l.size * l.price) for l in list(store[coin].liquidations) if l.time > cutoff)
+            self._liqs[(coin, window)] = entries
+            self._liq_sums[(coin, window)] = self._last[(coin, f"liq_notional:{window}")] = sum(n for _, n in entries)
+        windows[window] = windows.get(window, 0) + 1
+
+    def _close_window(self, coin: str, window: int):
+        windows = self._liq_windows[coin]
+        windows[window] -= 1
+        if not windows[window]:
+            del windows[window]
+            self._liqs.pop((coin, window), None)
+            self._liq_sums.pop((coin, window), None)
+            self._last.pop((coin, f"liq_notional:{window}"), None)
+
+    def rules(self, coin: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            return [r.to_dict() for r in self._rules.values() if coin is None or r.coin == coin]
+
+    # ── Evaluation (feed thread) ─────────────────────────────
+
+    def on_value(self, coin: str, series: str, value: float) -> List[dict]:
+        key = (coin, series)
+        prev = self._last.get(key)
+        self._last[key] = value
+        if prev is None or key not in self._index:
+            return []
+        with self._lock:
+            index = self._index.get(key)
+            if index is None:
+                return []
+            triggers = []
+            for rule_id in index.crossed(prev, value):
+                rule = self._rules[rule_id]
+                triggers.append(self._trigger(rule, value))
+                if rule.once:
+                    del self._rules[rule_id]
+                    self._unindex(rule)
+            return triggers
+
+    def on_liquidation(self, coin: str, time_ms: int, notional: float) -> List[dict]:
+        """Roll every liquidation window that has rules for this coin."""
+        if not self._liq_windows[coin]:
+            return []
+        triggers = []
+        with self._lock:
+            for window in list(self._liq_windows[coin]):
+                key = (coin, window)
+                entries = self._liqs.get(key)
+                if entries is None:
+                    continue
+                entries.append((time_ms, notional))
+                total = self._liq_sums.get(key, 0.0) + notional
+                cutoff = time_ms - window * 1000
+                while entries and entries[0][0] <= cutoff:
+                    total -= entries.popleft()[1]
+                self._liq_sums[key] = total
+                triggers.extend(self.on_value(coin, f"liq_notional:{window}", total))
+        return triggers
+
+    def _trigger(self, rule: Rule, value: float) -> dict:
+        self.fired += 1
+        trigger = {
+            "id": rule.id,
+            "coin": rule.coin,
+            "metric": rule.metric,
+            "op": rule.op,
+            "threshold": rule.threshold,
+            "window": rule.window,
+            "value": value,
+            "note": rule.note,
+            "time": int(time.time() * 1000),
+        }
+        if rule.webhook:
+            self._enqueue_webhook(rule.webhook, trigger)
+        return trigger
+
+    # ── Webhook delivery (serving loop) ──────────────────────
+
+    def _enqueue_webhook(self, url: str, trigger: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self.webhooks_dropped += 1
+            return
+        loop.call_soon_threadsafe(self._put_webhook, url, trigger)
+
+    def _put_webhook(self, url: str, trigger: dict):
+        try:
+            self._webhooks.put_nowait((url, trigger))
+        except asyncio.QueueFull:
+            self.webhooks_dropped += 1
+            logger.warning("Alert webhook queue full, dropping trigger %s", trigger["id"])
+
+    async def run(self):
+        """Deliver webhook triggers. Started from the FastAPI lifespan."""
+        self._loop = asyncio.get_running_loop()
+        self._webhooks = asyncio.Queue(maxsize=WEBHOOK_QUEUE_SIZE)
+        async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT) as client:
+            while True:
+                url, trigger = await self._webhooks.get()
+                try:
+                    await check_webhook(url)  # the host may have been re-pointed since
+                    resp = await client.post(url, json={"type": "alert", "data": trigger})
+                    resp.raise_for_status()
+                except Exception as e:
+                    logger.warning("Alert webhook to %s failed: %s", url, e)
+
+    def report(self) -> dict:
+        return {
+            "rules": len(self._rules),
+            "per_coin": dict(self._per_coin),
+            "fired": self.fired,
+            "webhook_queue": self._webhooks.qsize() if self._webhooks is not None else 0,
+            "webhooks_dropped": self.webhooks_dropped,
+        }
+
+
+# Global engine — fed from the feed callbacks
+alert_engine = AlertEngine()
@@ -0,0 +1,42 @@
+"""
+Compact encoding for the in-progress candle.
+Full bars go out on bar open and every KEYFRAME_EVERY updates; in between,
+subscribers to the "candle_delta" topic only get the fields that moved.
+"""
+from typing import Optional
+
+from .store import CandleBar
+
+KEYFRAME_EVERY = 30
+
+# CandleBar field → short wire name used in candle_delta messages
+DELTA_FIELDS = (("open", "o"), ("high", "h"), ("low", "l"), ("close", "c"), ("volume", "v"))
+
+
+class CandleDeltaEncoder:
+    """Tracks the last state sent for one candle series."""
+
+    def __init__(self, keyframe_every: int = KEYFRAME_EVERY):
+        self.keyframe_every = keyframe_every
+        self._last: Optional[CandleBar] = None
+        self._since_keyframe = 0
+
+    def encode(self, bar: CandleBar) -> Optional[dict]:
+        """None → send the full bar; {} → nothing changed; otherwise a patch
+        {"time", <short field>: value, ...} against the last sent state."""
+        last = self._last
+        if last is None or bar.time != last.time or self._since_keyframe >= self.keyframe_every:
+            self._last = CandleBar(bar.time, bar.open, bar.high, bar.low, bar.close, bar.volume)
+            self._since_keyframe = 0
+            return None
+
+        patch = {}
+        for field, short in DELTA_FIELDS:
+            value = getattr(bar, field)
+            if value != getattr(last, field):
+                patch[short] = value
+                setattr(last, field, value)
+        if patch:
+            patch["time"] = bar.time
+            self._since_keyframe += 1
+        return patch
@@ -1,24 +1,24 @@
 """
 cryptofeed FeedHandler setup.
 Subscribes to Binance spot + BinanceFutures and populates the in-memory store.
-Notifies registered WebSocket broadcasters via asyncio.Queue per coin.
+Notifies registered WebSocket / SSE streams via asyncio.Queue per coin; each
+message is JSON-encoded once and the same frame is shared by every client.
 """
 import asyncio
+import json
 import logging
+import time
+import uuid
+from collections import deque
 from decimal import Decimal
-from typing import Callable, Dict, Set
-
-from cryptofeed import FeedHandler
-from cryptofeed.defines import (
-    CANDLES,
-    FUNDING,
-    L2_BOOK,
-    LIQUIDATIONS,
-    OPEN_INTEREST,
-    TRADES,
-)
-from cryptofeed.exchanges import Binance, BinanceFutures
-
+from typing import TYPE_CHECKING, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from . import profiling, readiness
+from .alerts import alert_engine
+from .deltas import CandleDeltaEncoder
+from .footprint import DELTA_INTERVAL, footprints
+from .heatmap import DEPTH_LEVELS, heatmaps
+from .indicators import indicator_hub
 from .store import (
     COINS,
     CandleBar,
@@ -28,6 +28,13 @@ from .store import (
     Trade,
     store,
 )
+from .tape import AggTrade, TapeAggregator
+from .trade_bars import trade_bars
+from .trade_candles import FLUSH_INTERVAL, LOCAL_1M, trade_candles
+from .volume_profile import volume_profiles
+
+if TYPE_CHECKING:
+    from cryptofeed import FeedHandler
 
 logger = logging.getLogger(__name__)
 
@@ -35,30 +42,139 @@ logger = logging.getLogger(__name__)
 SPOT_SYMBOLS = {coin: f"{coin}-USDT" for coin in COINS}
 FUTURES_SYMBOLS = {coin: f"{coin}-USDT-PERP" for coin in COINS}
 
-# Per-coin broadcast queues — ws.py subscribes to these
-_queues: Dict[str, Set[asyncio.Queue]] = {coin: set() for coin in COINS}
+# Per-coin broadcast queues — ws.py subscribes to these.
+# Each queue maps to the opt-in topics it receives on top of the default stream.
+# Queues carry pre-encoded JSON frames; None tells the client to disconnect.
+_queues: Dict[str, Dict[asyncio.Queue, FrozenSet[str]]] = {coin: {} for coin in COINS}
+
+# Loop that owns the queues. Callbacks run on the FeedHandler's thread, so
+# fan-out is handed over to this loop instead of touching queues directly.
+_serving_loop: Optional[asyncio.AbstractEventLoop] = None
 
+# Loop that applies feed events to the store (feed thread, or the ingest merge
+# thread). Store buffers are only swapped out from this loop.
+_feed_loop: Optional[asyncio.AbstractEventLoop] = None
 
-def subscribe(coin: str, q: asyncio.Queue):
-    _queues[coin].add(q)
+
+def subscribe(coin: str, q: asyncio.Queue, topics: Iterable[str] = ()):
+    _queues[coin][q] = frozenset(topics)
 
 
 def unsubscribe(coin: str, q: asyncio.Queue):
-    _queues[coin].discard(q)
+    _queues[coin].pop(q, None)
+
+
+def subscriber_count(coin: str) -> int:
+    return len(_queues[coin])
+
 
+def subscriber_queues(coin: str) -> list:
+    return list(_queues[coin])
 
-async def _broadcast(coin: str, msg: dict):
-    dead = set()
-    for q in _queues[coin]:
+
+# Sequence numbers per (coin, channel). A channel is the message type, or the
+# topic for opt-in streams. Seqs restart with the process; EPOCH tells
+# reconnecting clients whether their numbers still mean anything.
+EPOCH = uuid.uuid4().hex[:12]
+REPLAY_SIZE = 256
+_seqs: Dict[Tuple[str, str], int] = {}  # assigned on the feed thread
+_replay: Dict[Tuple[str, str], Deque[Tuple[int, str]]] = {}  # filled on the serving loop
+
+
+async def _broadcast(coin: str, msg: dict, topic: Optional[str] = None, unless: Optional[str] = None):
+    """Encode a message once and fan it out to a coin's queues. Messages with a
+    topic only go to queues that opted into it; `unless` skips queues that
+    opted into an alternative encoding of the same data."""
+    channel = topic or msg["type"]
+    key = (coin, channel)
+    seq = _seqs[key] = _seqs.get(key, 0) + 1
+    stamped = {**msg, "seq": seq}
+    if channel != msg["type"]:
+        stamped["ch"] = channel
+    frame = json.dumps(stamped)
+    loop = _serving_loop
+    if loop is not None and not loop.is_closed():
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not loop:
+            loop.call_soon_threadsafe(_fan_out, coin, channel, seq, frame, topic, unless)
+            return
+    _fan_out(coin, channel, seq, frame, topic, unless)
+
+
+def _fan_out(coin: str, channel: str, seq: int, frame: str, topic: Optional[str], unless: Optional[str]):
+    buffer = _replay.get((coin, channel))
+    if buffer is None:
+        buffer = _replay[(coin, channel)] = deque(maxlen=REPLAY_SIZE)
+    buffer.append((seq, frame))
+
+    dead = []
+    for q, topics in _queues[coin].items():
+        if topic is not None and topic not in topics:
+            continue
+        if unless is not None and unless in topics:
+            continue
         try:
-            q.put_nowait(msg)
+            q.put_nowait(frame)
         except asyncio.QueueFull:
-            dead.add(q)
+            dead.append(q)
     for q in dead:
-        _queues[coin].discard(q)
+        _evict(coin, q)
+
+
+def current_seq(coin: str, channel: str) -> int:
+    """Seq of the last frame fanned out on a channel (0 if none yet)."""
+    buffer = _replay.get((coin, channel))
+    return buffer[-1][0] if buffer else 0
+
+
+def replay_since(coin: str, channel: str, last_seq: int) -> Optional[List[str]]:
+    """Frames after `last_seq`, or None when the buffer no longer reaches back
+    that far (the client needs a snapshot instead)."""
+    current = current_seq(coin, channel)
+    if last_seq == current:
+        return []
+    if last_seq > current:
+        return None
+    buffer = _replay[(coin, channel)]
+    if buffer[0][0] > last_seq + 1:
+        return None
+    return [frame for seq, frame in buffer if seq > last_seq]
+
+
+def replay_buffers() -> List[Deque[Tuple[int, str]]]:
+    return list(_replay.values())
+
+
+def _evict(coin: str, q: asyncio.Queue):
+    """Drop a client that cannot keep up; its sender sees None and closes."""
+    _queues[coin].pop(q, None)
+    while not q.empty():
+        q.get_nowait()
+    q.put_nowait(None)
+
+
+# Per-coin aggregated trade tape (opt-in "agg_trade" topic)
+_tapes: Dict[str, TapeAggregator] = {coin: TapeAggregator() for coin in COINS}
+
+# Per-coin compact 1m candle stream (opt-in "candle_delta" topic)
+_candle_deltas: Dict[str, CandleDeltaEncoder] = {coin: CandleDeltaEncoder() for coin in COINS}
+
+# Spot-perp basis (opt-in "basis" topic). Recomputed on every book / ticker /
+# mark update, but streamed at most once per BASIS_INTERVAL per coin.
+BASIS_INTERVAL = 1.0
+_basis_pending: Dict[str, bool] = {coin: False for coin in COINS}
+_basis_sent: Dict[str, float] = {coin: 0.0 for coin in COINS}
 
 
 # ── Callbacks ────────────────────────────────────────────────
+# Each feed event is split in two: a normalizer that turns the cryptofeed
+# object into (coin, payload) with plain store types, and an apply step that
+# updates the store and broadcasts. In-process callbacks run both on the feed
+# thread; ingest shards run the normalizers in worker processes and send the
+# payloads to the serving process, which runs the apply steps (see ingest.py).
 
 
 def _symbol_to_coin(symbol: str) -> str:
@@ -66,11 +182,7 @@ def _symbol_to_coin(symbol: str) -> str:
     return symbol.split("-")[0]
 
 
-async def candle_cb(candle, receipt_timestamp):
-    coin = _symbol_to_coin(candle.symbol)
-    if coin not in store:
-        return
-
+def normalize_candle(candle) -> Tuple[str, Tuple[CandleBar, bool]]:
     bar = CandleBar(
         time=int(candle.start),
         open=float(candle.open),
@@ -79,120 +191,379 @@ async def candle_cb(candle, receipt_timestamp):
         close=float(candle.close),
         volume=float(candle.volume),
     )
-    store[coin].update_candle("1m", bar)
-    await _broadcast(coin, {"type": "candle", "data": bar.to_dict()})
+    return _symbol_to_coin(candle.symbol), (bar, bool(candle.closed))
 
 
-async def trade_cb(trade, receipt_timestamp):
-    coin = _symbol_to_coin(trade.symbol)
+async def apply_candle(coin: str, kline: Tuple[CandleBar, bool]):
     if coin not in store:
         return
+    bar, closed = kline
+    if LOCAL_1M:
+        # Trades drive the open 1m bar; the closed kline is authoritative
+        if not closed:
+            return
+        trade_candles[coin].seal("1m", bar)
+    if not store[coin].candles["1m"]:
+        readiness.mark(f"first_candle:{coin}")
+    updated = store[coin].update_candle("1m", bar)
+    if updated:
+        await _emit_candle(coin, bar)
+    elif updated is False:
+        await _emit_candle_fix(coin, bar)
+
+
+async def _emit_candle(coin: str, bar: CandleBar):
+    full = {"type": "candle", "data": bar.to_dict()}
+    await _broadcast(coin, full, unless="candle_delta")
+    patch = _candle_deltas[coin].encode(bar)
+    if patch is None:
+        await _broadcast(coin, full, topic="candle_delta")
+    elif patch:
+        await _broadcast(coin, {"type": "candle_delta", "data": patch}, topic="candle_delta")
+    await _emit_indicators(coin, "1m", bar)
+
+
+async def _emit_candle_fix(coin: str, bar: CandleBar):
+    """A late bar replaced an older stored one (the closed kline after trades
+    opened the next bar). It goes out as `candle_fix` rather than `candle`,
+    which would be out of order, and the 1m indicators are recomputed."""
+    await _broadcast(coin, {"type": "candle_fix", "data": bar.to_dict()})
+    bars = list(store[coin].candles["1m"])
+    for key, point in indicator_hub.reseed(coin, "1m", bars, since=bar.time):
+        msg_type = "indicator_fix" if point["time"] == bar.time else "indicator"
+        await _broadcast(coin, {"type": msg_type, "data": {"key": key, **point}}, topic=f"indicator:{key}")
+
+
+async def _emit_indicators(coin: str, tf: str, bar: CandleBar):
+    for key, point in indicator_hub.on_candle(coin, tf, bar):
+        await _broadcast(coin, {"type": "indicator", "data": {"key": key, **point}}, topic=f"indicator:{key}")
+
+
+@profiling.timed("candle_cb")
+async def candle_cb(candle, receipt_timestamp):
+    await apply_candle(*normalize_candle(candle))
 
+
+def normalize_trade(trade) -> Tuple[str, Trade]:
     t = Trade(
         price=float(trade.price),
         size=float(trade.amount),
         side=trade.side.value if hasattr(trade.side, "value") else str(trade.side),
         time=int(trade.timestamp * 1000),
     )
-    store[coin].trades.append(t)
-    await _broadcast(coin, {"type": "trade", "data": t.to_dict()})
+    return _symbol_to_coin(trade.symbol), t
 
 
-async def book_cb(book, receipt_timestamp):
-    coin = _symbol_to_coin(book.symbol)
+async def apply_trade(coin: str, t: Trade):
     if coin not in store:
         return
+    store[coin].trades.append(t)
+    volume_profiles[coin].add(t)
+    for tf, bar, opened, schedule in trade_candles[coin].add(t):
+        if opened:
+            store[coin].update_candle(tf, bar)
+        if schedule:
+            asyncio.get_running_loop().call_later(FLUSH_INTERVAL, _flush_trade_candles, coin, tf)
+    for key in trade_bars[coin].add(t):
+        asyncio.get_running_loop().call_later(FLUSH_INTERVAL, _flush_trade_bars, coin, key)
+    await _emit_alerts(coin, alert_engine.on_value(coin, "price", t.price))
+    for tf in footprints[coin].add(t):
+        asyncio.get_running_loop().call_later(DELTA_INTERVAL, _flush_footprint, coin, tf)
+    await _broadcast(coin, {"type": "trade", "data": t.to_dict()}, unless="agg_trade")
+
+    tape = _tapes[coin]
+    closed = tape.add(t)
+    if closed is not None:
+        await _emit_agg_trade(coin, closed)
+    opened = tape.pending
+    if opened is not None and opened.count == 1:
+        # Close the print when its window ends even if no further trade arrives
+        asyncio.get_running_loop().call_later(
+            tape.window_ms / 1000, _flush_agg_trade, coin, opened
+        )
+
+
+@profiling.timed("trade_cb")
+async def trade_cb(trade, receipt_timestamp):
+    await apply_trade(*normalize_trade(trade))
+
+
+async def _emit_agg_trade(coin: str, agg: AggTrade):
+    store[coin].agg_trades.append(agg)
+    await _broadcast(coin, {"type": "agg_trade", "data": agg.to_dict()}, topic="agg_trade")
+
+
+def _flush_agg_trade(coin: str, agg: AggTrade):
+    if _tapes[coin].flush(expected=agg) is not None:
+        asyncio.ensure_future(_emit_agg_trade(coin, agg))
+
+
+def _flush_trade_candles(coin: str, tf: str):
+    for bar in trade_candles[coin].flush(tf):
+        asyncio.ensure_future(_emit_trade_candle(coin, tf, bar.to_dict()))
+
+
+async def _emit_trade_candle(coin: str, tf: str, data: dict):
+    if tf == "1m":
+        await _emit_candle(coin, CandleBar(**data))
+        return
+    await _broadcast(coin, {"type": "candle", "tf": tf, "data": data}, topic=f"candle:{tf}")
+    await _emit_indicators(coin, tf, CandleBar(**data))
+
+
+def _flush_trade_bars(coin: str, key: str):
+    for bar in trade_bars[coin].flush(key):
+        asyncio.ensure_future(_broadcast(coin, {"type": "bar", "series": key, "data": bar}, topic=f"bars:{key}"))
+
+
+async def _emit_alerts(coin: str, triggers: List[dict]):
+    for trigger in triggers:
+        await _broadcast(coin, {"type": "alert", "data": trigger}, topic="alert")
+
 
+def publish_alerts(coin: str, triggers: List[dict]):
+    """Stream triggers raised outside the feed callbacks (a rule that already
+    holds when added) on the alert channel, from the feed loop like the rest."""
+    call_on_feed_loop(lambda: asyncio.ensure_future(_emit_alerts(coin, triggers)))
+
+
+def _flush_footprint(coin: str, tf: str):
+    for msg_type, data in footprints[coin].flush(tf):
+        asyncio.ensure_future(_broadcast(coin, {"type": msg_type, "data": data}, topic=f"footprint:{tf}"))
+
+
+def _top_levels(side) -> List[Tuple[float, float]]:
+    return [(float(price), float(size)) for price, size in (side.index(i) for i in range(min(DEPTH_LEVELS, len(side))))]
+
+
+def normalize_book(book) -> Tuple[str, tuple]:
+    coin = _symbol_to_coin(book.symbol)
     bid = float(max(book.book.bids)) if book.book.bids else 0.0
     ask = float(min(book.book.asks)) if book.book.asks else 0.0
+    # Depth heatmap column, sampled where the full book lives
+    depth = None
+    heatmap = heatmaps.get(coin)
+    if heatmap is not None and heatmap.sample_due():
+        depth = (int(time.time()), _top_levels(book.book.bids), _top_levels(book.book.asks))
+    return coin, (bid, ask, depth)
 
+
+async def apply_book(coin: str, top: tuple):
+    if coin not in store:
+        return
+    bid, ask, depth = top
     snap = store[coin].book
-    snap.bid = bid
-    snap.ask = ask
+    if not snap.bid or snap.restored:
+        readiness.mark(f"first_book:{coin}")
+    snap.bid, snap.ask = bid, ask
+    snap.restored = False
+    if depth is not None:
+        heatmaps[coin].add(*depth)
     await _broadcast(coin, {"type": "book", "data": snap.to_dict()})
+    await _emit_alerts(coin, alert_engine.on_value(coin, "spread", snap.spread))
+    _touch_basis(coin)
 
 
-async def funding_cb(funding, receipt_timestamp):
-    coin = _symbol_to_coin(funding.symbol)
+@profiling.timed("book_cb")
+async def book_cb(book, receipt_timestamp):
+    await apply_book(*normalize_book(book))
+
+
+def normalize_perp_ticker(ticker) -> Tuple[str, Tuple[float, float]]:
+    bid = float(ticker.bid) if ticker.bid else 0.0
+    ask = float(ticker.ask) if ticker.ask else 0.0
+    return _symbol_to_coin(ticker.symbol), (bid, ask)
+
+
+async def apply_perp_ticker(coin: str, top: Tuple[float, float]):
     if coin not in store:
         return
+    perp = store[coin].perp
+    perp.bid, perp.ask = top
+    perp.restored = False
+    _touch_basis(coin)
+
+
+@profiling.timed("perp_ticker_cb")
+async def perp_ticker_cb(ticker, receipt_timestamp):
+    await apply_perp_ticker(*normalize_perp_ticker(ticker))
+
+
+def _touch_basis(coin: str):
+    """Recompute the coin's basis and schedule a throttled send if none is due."""
+    snap = store[coin]
+    if not snap.basis.update(snap.book, snap.perp, snap.funding, int(time.time() * 1000)):
+        return
+    if _basis_pending[coin]:
+        return
+    _basis_pending[coin] = True
+    delay = max(0.0, _basis_sent[coin] + BASIS_INTERVAL - time.monotonic())
+    asyncio.get_running_loop().call_later(delay, _flush_basis, coin)
 
+
+def _flush_basis(coin: str):
+    _basis_pending[coin] = False
+    _basis_sent[coin] = time.monotonic()
+    data = store[coin].basis.to_dict()
+    asyncio.ensure_future(_broadcast(coin, {"type": "basis", "data": data}, topic="basis"))
+
+
+def normalize_funding(funding) -> Tuple[str, tuple]:
+    rate = float(funding.rate) if funding.rate else 0.0
+    next_time = int(funding.next_funding_time * 1000) if funding.next_funding_time else 0
+    mark = float(funding.mark_price) if funding.mark_price else 0.0
+    # The markPrice stream behind FUNDING also carries the index price
+    raw = funding.raw if isinstance(funding.raw, dict) else {}
+    index = float(raw["i"]) if raw.get("i") else None
+    return _symbol_to_coin(funding.symbol), (rate, next_time, mark, index)
+
+
+async def apply_funding(coin: str, values: tuple):
+    if coin not in store:
+        return
+    rate, next_time, mark, index = values
     fd = store[coin].funding
-    fd.rate = float(funding.rate) if funding.rate else 0.0
-    fd.next_funding_time = int(funding.next_funding_time * 1000) if funding.next_funding_time else 0
+    fd.rate = rate
+    fd.next_funding_time = next_time
     await _broadcast(coin, {"type": "funding", "data": fd.to_dict()})
+    await _emit_alerts(coin, alert_engine.on_value(coin, "funding", rate))
 
+    perp = store[coin].perp
+    perp.mark_price = mark
+    perp.restored = False
+    if index is not None:
+        perp.index_price = index
+    _touch_basis(coin)
 
-async def oi_cb(oi, receipt_timestamp):
-    coin = _symbol_to_coin(oi.symbol)
+
+@profiling.timed("funding_cb")
+async def funding_cb(funding, receipt_timestamp):
+    await apply_funding(*normalize_funding(funding))
+
+
+def normalize_oi(oi) -> Tuple[str, Tuple[float, int]]:
+    value = float(oi.open_interest) if oi.open_interest else 0.0
+    timestamp = int(oi.timestamp * 1000) if oi.timestamp else 0
+    return _symbol_to_coin(oi.symbol), (value, timestamp)
+
+
+async def apply_oi(coin: str, values: Tuple[float, int]):
     if coin not in store:
         return
-
     oi_data = store[coin].open_interest
-    oi_data.open_interest = float(oi.open_interest) if oi.open_interest else 0.0
-    oi_data.timestamp = int(oi.timestamp * 1000) if oi.timestamp else 0
+    oi_data.open_interest, oi_data.timestamp = values
     await _broadcast(coin, {"type": "oi", "data": oi_data.to_dict()})
 
 
-async def liquidation_cb(liquidation, receipt_timestamp):
-    coin = _symbol_to_coin(liquidation.symbol)
-    if coin not in store:
-        return
+@profiling.timed("oi_cb")
+async def oi_cb(oi, receipt_timestamp):
+    await apply_oi(*normalize_oi(oi))
 
+
+def normalize_liquidation(liquidation) -> Tuple[str, LiquidationEvent]:
     liq = LiquidationEvent(
         side=liquidation.side.value if hasattr(liquidation.side, "value") else str(liquidation.side),
         size=float(liquidation.quantity),
         price=float(liquidation.price),
         time=int(liquidation.timestamp * 1000),
     )
+    return _symbol_to_coin(liquidation.symbol), liq
+
+
+async def apply_liquidation(coin: str, liq: LiquidationEvent):
+    if coin not in store:
+        return
     store[coin].liquidations.append(liq)
     await _broadcast(coin, {"type": "liquidation", "data": liq.to_dict()})
+    await _emit_alerts(coin, alert_engine.on_liquidation(coin, liq.time, liq.size * liq.price))
+
+
+@profiling.timed("liquidation_cb")
+async def liquidation_cb(liquidation, receipt_timestamp):
+    await apply_liquidation(*normalize_liquidation(liquidation))
+
+
+# Event kind → (normalizer, apply step, in-process callback)
+EVENTS: Dict[str, Tuple[Callable, Callable, Callable]] = {
+    "candle": (normalize_candle, apply_candle, candle_cb),
+    "trade": (normalize_trade, apply_trade, trade_cb),
+    "book": (normalize_book, apply_book, book_cb),
+    "perp_ticker": (normalize_perp_ticker, apply_perp_ticker, perp_ticker_cb),
+    "funding": (normalize_funding, apply_funding, funding_cb),
+    "oi": (normalize_oi, apply_oi, oi_cb),
+    "liquidation": (normalize_liquidation, apply_liquidation, liquidation_cb),
+}
 
 
 # ── FeedHandler setup ─────────────────────────────────────────
 
 
-def build_feed_handler() -> FeedHandler:
+def build_feed_handler(coins: Iterable[str] = COINS, callbacks: Optional[Dict[str, Callable]] = None) -> "FeedHandler":
+    """FeedHandler for `coins`; `callbacks` maps event kind → callback and
+    defaults to the in-process callbacks that update the store directly."""
+    # cryptofeed and its exchange modules are heavy and Binance() fetches
+    # exchange info over blocking HTTP, so this runs off the serving loop.
+    with readiness.phase("import_cryptofeed"):
+        from cryptofeed import FeedHandler
+        from cryptofeed.defines import (
+            CANDLES,
+            FUNDING,
+            L2_BOOK,
+            LIQUIDATIONS,
+            OPEN_INTEREST,
+            TICKER,
+            TRADES,
+        )
+        from cryptofeed.exchanges import Binance, BinanceFutures
+
+    if callbacks is None:
+        callbacks = {kind: callback for kind, (_, _, callback) in EVENTS.items()}
+
     fh = FeedHandler()
 
-    spot_symbols = list(SPOT_SYMBOLS.values())
-    futures_symbols = list(FUTURES_SYMBOLS.values())
+    coins = list(coins)
+    spot_symbols = [SPOT_SYMBOLS[coin] for coin in coins]
+    futures_symbols = [FUTURES_SYMBOLS[coin] for coin in coins]
 
     # Binance spot: candles + trades + L2 book (best bid/ask extracted from top of book)
     try:
-        fh.add_feed(
-            Binance(
-                subscription={
-                    CANDLES: spot_symbols,
-                    TRADES: spot_symbols,
-                    L2_BOOK: spot_symbols,
-                },
-                callbacks={
-                    CANDLES: candle_cb,
-                    TRADES: trade_cb,
-                    L2_BOOK: book_cb,
-                },
+        with readiness.phase("add_feed:binance"):
+            fh.add_feed(
+                Binance(
+                    subscription={
+                        CANDLES: spot_symbols,
+                        TRADES: spot_symbols,
+                        L2_BOOK: spot_symbols,
+                    },
+                    callbacks={
+                        CANDLES: callbacks["candle"],
+                        TRADES: callbacks["trade"],
+                        L2_BOOK: callbacks["book"],
+                    },
+                )
             )
-        )
     except Exception as e:
         logger.error("Failed to add Binance spot feed: %s", e)
 
-    # BinanceFutures: funding rates + liquidations + open interest (perp symbols: BTC-USDT-PERP)
+    # BinanceFutures: funding / mark price + liquidations + open interest + top of book (perp symbols: BTC-USDT-PERP)
     try:
-        fh.add_feed(
-            BinanceFutures(
-                subscription={
-                    FUNDING: futures_symbols,
-                    LIQUIDATIONS: futures_symbols,
-                    OPEN_INTEREST: futures_symbols,
-                },
-                callbacks={
-                    FUNDING: funding_cb,
-                    LIQUIDATIONS: liquidation_cb,
-                    OPEN_INTEREST: oi_cb,
-                },
+        with readiness.phase("add_feed:binance_futures"):
+            fh.add_feed(
+                BinanceFutures(
+                    subscription={
+                        FUNDING: futures_symbols,
+                        LIQUIDATIONS: futures_symbols,
+                        OPEN_INTEREST: futures_symbols,
+                        TICKER: futures_symbols,
+                    },
+                    callbacks={
+                        FUNDING: callbacks["funding"],
+                        LIQUIDATIONS: callbacks["liquidation"],
+                        OPEN_INTEREST: callbacks["oi"],
+                        TICKER: callbacks["perp_ticker"],
+                    },
+                )
             )
-        )
     except Exception as e:
         logger.error("Failed to add BinanceFutures feed: %s", e)
 
@@ -202,8 +573,10 @@ def build_feed_handler() -> FeedHandler:
 def _run_feed_sync(fh) -> None:
     """Run fh.run() inside a fresh event loop in a background thread.
     signal handlers are disabled because we're not on the main thread."""
+    profiling.register_thread("feed")
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
+    bind_feed_loop(loop)
     try:
         fh.run(install_signal_handlers=False)
     except TypeError:
@@ -219,15 +592,51 @@ def _run_feed_sync(fh) -> None:
         loop.close()
 
 
+def bind_feed_loop(loop: asyncio.AbstractEventLoop):
+    global _feed_loop
+    _feed_loop = loop
+
+
+def call_on_feed_loop(fn: Callable, *args):
+    """Run `fn` where store updates are applied, so it never races them;
+    directly when there is no feed loop (yet)."""
+    loop = _feed_loop
+    if loop is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(fn, *args)
+    else:
+        fn(*args)
+
+
+async def run_on_feed_loop(fn: Callable, *args):
+    """call_on_feed_loop for callers on the serving loop that need the result."""
+    loop = _feed_loop
+    if loop is None or loop.is_closed():
+        return fn(*args)
+
+    async def call():
+        return fn(*args)
+
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(call(), loop))
+
+
+def bind_serving_loop() -> asyncio.AbstractEventLoop:
+    """Make the running loop the owner of the client queues."""
+    global _serving_loop
+    _serving_loop = loop = asyncio.get_running_loop()
+    profiling.register_thread("serving")
+    return loop
+
+
 async def run_feed():
     """Start the feed handler in the background. Called from FastAPI lifespan."""
+    loop = bind_serving_loop()
     try:
-        fh = build_feed_handler()
+        with readiness.phase("build_feed_handler"):
+            fh = await loop.run_in_executor(None, build_feed_handler)
     except Exception as e:
         logger.error("Failed to build FeedHandler: %s", e)
         return
     logger.info("Starting cryptofeed FeedHandler...")
-    loop = asyncio.get_event_loop()
     try:
         await loop.run_in_executor(None, _run_feed_sync, fh)
     except Exception as e:
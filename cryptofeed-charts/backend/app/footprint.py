@@ -0,0 +1,146 @@
+"""
+Footprint bars: buy / sell volume per price level for each bar of the
+timeframes in FOOTPRINT_TIMEFRAMES (off when empty), built from live trades.
+Levels are sparse buckets at the coin's tick size; a bar that grows past
+MAX_LEVELS doubles its tick and merges neighbours, so totals stay exact and
+memory per bar stays bounded.
+"""
+import os
+import sys
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from .store import COINS, TIMEFRAME_SECONDS, Trade
+from .volume_profile import BUCKET_BYTES, tick_size
+
+FOOTPRINT_TIMEFRAMES = [
+    tf for tf in os.environ.get("FOOTPRINT_TIMEFRAMES", "").split(",") if tf in TIMEFRAME_SECONDS
+]
+MAX_LEVELS = 64
+MAX_BARS = 200
+DELTA_INTERVAL = 0.25  # per-bar deltas are coalesced over this many seconds
+
+
+class FootprintBar:
+    __slots__ = ("time", "tick", "levels", "changed", "full")
+
+    def __init__(self, time: int, tick: float):
+        self.time = time
+        self.tick = tick
+        # bucket index -> [buy volume, sell volume]
+        self.levels: Dict[int, List[float]] = {}
+        self.changed: Set[int] = set()  # buckets touched since the last delta
+        self.full = True                # next send must be the whole bar
+
+    def add(self, price: float, size: float, buy: bool):
+        bucket = int(price // self.tick)
+        volumes = self.levels.get(bucket)
+        if volumes is None:
+            volumes = self.levels[bucket] = [0.0, 0.0]
+        volumes[0 if buy else 1] += size
+        self.changed.add(bucket)
+        if len(self.levels) > MAX_LEVELS:
+            self._coarsen()
+
+    def _coarsen(self):
+        while len(self.levels) > MAX_LEVELS:
+            self.tick *= 2
+            merged: Dict[int, List[float]] = {}
+            for bucket, (buy, sell) in self.levels.items():
+                volumes = merged.get(bucket // 2)
+                if volumes is None:
+                    volumes = merged[bucket // 2] = [0.0, 0.0]
+                volumes[0] += buy
+                volumes[1] += sell
+            self.levels = merged
+        self.changed.clear()
+        self.full = True
+
+    def _level(self, bucket: int) -> list:
+        buy, sell = self.levels[bucket]
+        return [round(bucket * self.tick, 10), buy, sell]
+
+    def to_dict(self) -> dict:
+        return {"time": self.time, "tick": self.tick, "levels": [self._level(b) for b in sorted(self.levels)]}
+
+    def take_delta(self) -> Optional[dict]:
+        """Whole bar if it is new or re-bucketed, else only the changed levels
+        (absolute values); None if nothing changed."""
+        if self.full:
+            self.full = False
+            self.changed.clear()
+            return self.to_dict()
+        if not self.changed:
+            return None
+        delta = {"time": self.time, "levels": [self._level(b) for b in sorted(self.changed)]}
+        self.changed.clear()
+        return delta
+
+
+class FootprintSeries:
+    """One coin's footprint bars for every enabled timeframe.
+
+    add() runs on the feed thread, reads on the serving loop; one lock."""
+
+    def __init__(self, tick: float):
+        self.tick = tick
+        self.bars: Dict[str, Deque[FootprintBar]] = {tf: deque(maxlen=MAX_BARS) for tf in FOOTPRINT_TIMEFRAMES}
+        # Bars that closed with changes not yet sent
+        self._closed: Dict[str, List[FootprintBar]] = {tf: [] for tf in FOOTPRINT_TIMEFRAMES}
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def add(self, trade: Trade) -> List[str]:
+        """Returns the timeframes that became dirty and need a flush scheduled."""
+        seconds = trade.time // 1000
+        buy = trade.side == "buy"
+        dirty = []
+        with self._lock:
+            for tf, bars in self.bars.items():
+                start = seconds - seconds % TIMEFRAME_SECONDS[tf]
+                if not bars or bars[-1].time < start:
+                    if bars and (bars[-1].full or bars[-1].changed):
+                        self._closed[tf].append(bars[-1])
+                    bars.append(FootprintBar(start, self.tick))
+                bar = bars[-1]
+                if bar.time > start:
+                    continue  # late trade for a closed bar
+                bar.add(trade.price, trade.size, buy)
+                if tf not in self._pending:
+                    self._pending.add(tf)
+                    dirty.append(tf)
+        return dirty
+
+    def flush(self, tf: str) -> List[Tuple[str, dict]]:
+        """(message type, data) to broadcast: closed bars in full, then the
+        open bar as a full "footprint" or a "footprint_delta"."""
+        with self._lock:
+            self._pending.discard(tf)
+            messages = [("footprint", bar.to_dict()) for bar in self._closed[tf]]
+            for bar in self._closed[tf]:
+                bar.full = False
+                bar.changed.clear()
+            self._closed[tf] = []
+            bars = self.bars[tf]
+            if bars:
+                full = bars[-1].full
+                data = bars[-1].take_delta()
+                if data is not None:
+                    messages.append(("footprint" if full else "footprint_delta", data))
+            return messages
+
+    def get(self, tf: str, limit: int) -> List[dict]:
+        with self._lock:
+            return [bar.to_dict() for bar in list(self.bars[tf])[-limit:]]
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(
+                sys.getsizeof(bars) + sum(sys.getsizeof(b.levels) + len(b.levels) * BUCKET_BYTES for b in bars)
+                for bars in self.bars.values()
+            )
+
+
+# Global series — one per coin, fed from the trade stream
+footprints: Dict[str, FootprintSeries] = {coin: FootprintSeries(tick_size(coin)) for coin in COINS}
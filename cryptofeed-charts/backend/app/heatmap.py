@@ -0,0 +1,106 @@
+"""
+Order-book depth heatmap history.
+Every HEATMAP_INTERVAL the top DEPTH_LEVELS of each book side are binned into
+PRICE_BINS fixed-width price bins around the mid and stored as one column of
+8-bit sizes relative to the column's largest bin. HEATMAP_COLUMNS columns per
+coin are kept in a ring (1h at 1s).
+"""
+import base64
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from .store import COINS
+
+HEATMAP_INTERVAL = 1.0
+DEPTH_LEVELS = 100
+PRICE_BINS = 200
+HEATMAP_COLUMNS = 3600
+MAX_RESPONSE_COLUMNS = 600
+
+# Price bin width per coin; HEATMAP_BIN_<COIN> overrides
+DEFAULT_BINS = {"BTC": 1.0, "ETH": 0.1, "SOL": 0.01, "XRP": 0.0001}
+
+Levels = Sequence[Tuple[float, float]]
+
+
+def bin_width(coin: str) -> float:
+    return float(os.environ.get(f"HEATMAP_BIN_{coin}", DEFAULT_BINS.get(coin, 0.01)))
+
+
+class HeatmapColumn:
+    __slots__ = ("time", "base", "scale", "sizes")
+
+    def __init__(self, time: int, base: int, scale: float, sizes: bytes):
+        self.time = time
+        self.base = base    # bin index of sizes[0]; price = (base + i) * bin
+        self.scale = scale  # size of a 255 bin
+        self.sizes = sizes
+
+    def to_dict(self) -> dict:
+        return {
+            "time": self.time,
+            "base": self.base,
+            "scale": self.scale,
+            "sizes": base64.b64encode(self.sizes).decode(),
+        }
+
+
+class DepthHeatmap:
+    def __init__(self, width: float):
+        self.bin = width
+        # Columns are immutable once appended, so readers only copy the deque
+        self.columns: Deque[HeatmapColumn] = deque(maxlen=HEATMAP_COLUMNS)
+        self._last_sample = 0.0
+
+    def sample_due(self) -> bool:
+        """Called where the book lives (feed thread or ingest worker)."""
+        now = time.monotonic()
+        if now - self._last_sample < HEATMAP_INTERVAL:
+            return False
+        self._last_sample = now
+        return True
+
+    def add(self, time_s: int, bids: Levels, asks: Levels):
+        if not bids or not asks:
+            return
+        mid = (bids[0][0] + asks[0][0]) / 2
+        base = int(mid // self.bin) - PRICE_BINS // 2
+        acc = [0.0] * PRICE_BINS
+        for price, size in bids:
+            i = int(price // self.bin) - base
+            if i < 0:
+                break
+            if i < PRICE_BINS:
+                acc[i] += size
+        for price, size in asks:
+            i = int(price // self.bin) - base
+            if i >= PRICE_BINS:
+                break
+            if i >= 0:
+                acc[i] += size
+        scale = max(acc)
+        if scale <= 0:
+            return
+        sizes = bytes(round(v / scale * 255) for v in acc)
+        self.columns.append(HeatmapColumn(time_s, base, scale, sizes))
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> dict:
+        """Columns with start <= time <= end, thinned to at most
+        MAX_RESPONSE_COLUMNS by keeping every n-th one."""
+        columns: List[HeatmapColumn] = [
+            c for c in list(self.columns)
+            if (start is None or c.time >= start) and (end is None or c.time <= end)
+        ]
+        step = max(1, -(-len(columns) // MAX_RESPONSE_COLUMNS))
+        return {
+            "bin": self.bin,
+            "bins": PRICE_BINS,
+            "step": step,
+            "columns": [c.to_dict() for c in columns[::step]],
+        }
+
+
+# Global heatmaps — one per coin, sampled from book updates
+heatmaps: Dict[str, DepthHeatmap] = {coin: DepthHeatmap(bin_width(coin)) for coin in COINS}
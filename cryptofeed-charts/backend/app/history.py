@@ -0,0 +1,85 @@
+"""
+Historical candles from Binance REST.
+Backs the /candles fallback and seeds the store's 1m series on startup so
+freshly booted instances serve full charts.
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+import httpx
+
+from .feed_manager import call_on_feed_loop
+from .store import COINS, MAX_CANDLES, CandleBar, store
+
+logger = logging.getLogger(__name__)
+
+# Binance REST base for historical candles
+BINANCE_REST = "https://api.binance.com/api/v3/klines"
+
+# 5s / 15s have no Binance kline interval; those are served from the store only
+TIMEFRAME_BINANCE = {
+    "1s": "1s",
+    "1m": "1m",
+    "5m": "5m",
+    "15m": "15m",
+    "1h": "1h",
+    "4h": "4h",
+    "1d": "1d",
+}
+
+# Only 1m is kept live by candle_cb; other timeframes are served from REST
+SEED_TIMEFRAME = "1m"
+
+
+async def fetch_candles(coin: str, tf: str, limit: int, client: Optional[httpx.AsyncClient] = None) -> Optional[List[dict]]:
+    """Historical klines as candle dicts, None on failure."""
+    symbol = f"{coin}USDT"
+    binance_tf = TIMEFRAME_BINANCE.get(tf)
+    if binance_tf is None:
+        return None
+    params = {"symbol": symbol, "interval": binance_tf, "limit": limit}
+    try:
+        if client is None:
+            async with httpx.AsyncClient(timeout=10) as own:
+                resp = await own.get(BINANCE_REST, params=params)
+        else:
+            resp = await client.get(BINANCE_REST, params=params)
+        resp.raise_for_status()
+        raw = resp.json()
+    except Exception as e:
+        logger.error("Binance REST error for %s %s: %s", coin, tf, e)
+        return None
+
+    return [
+        {
+            "time": int(k[0]) // 1000,  # ms → s for lightweight-charts
+            "open": float(k[1]),
+            "high": float(k[2]),
+            "low": float(k[3]),
+            "close": float(k[4]),
+            "volume": float(k[5]),
+        }
+        for k in raw
+    ]
+
+
+async def seed_store(retry_delay: float = 5.0, coins: List[str] = COINS):
+    """Fill each coin's 1m series from REST, retrying coins that fail."""
+    pending = list(coins)
+    async with httpx.AsyncClient(timeout=10) as client:
+        while pending:
+            results = await asyncio.gather(
+                *(fetch_candles(coin, SEED_TIMEFRAME, MAX_CANDLES, client) for coin in pending)
+            )
+            failed = []
+            for coin, candles in zip(pending, results):
+                if candles:
+                    # seed_candles swaps the deque; run it where the feed appends
+                    call_on_feed_loop(store[coin].seed_candles, SEED_TIMEFRAME, [CandleBar(**c) for c in candles])
+                else:
+                    failed.append(coin)
+            pending = failed
+            if pending:
+                logger.warning("Candle seed failed for %s, retrying in %.0fs", ", ".join(pending), retry_delay)
+                await asyncio.sleep(retry_delay)
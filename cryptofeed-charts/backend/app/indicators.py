@@ -0,0 +1,281 @@
+"""
+Server-side streaming indicator overlays (EMA / RSI / Bollinger).
+Each distinct (coin, tf, kind, period) instance is computed incrementally on
+top of the CoinStore candles and shared by every subscriber.
+"""
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from .store import MAX_CANDLES, TIMEFRAME_SECONDS, CandleBar, store
+from .trade_candles import SUBMINUTE_TIMEFRAMES
+
+MIN_PERIOD = 2
+MAX_PERIOD = 200
+BOLLINGER_STDDEV = 2.0
+
+# Timeframes whose store candles move live (1m klines, trade-built bars);
+# the others are only available as REST history.
+LIVE_TIMEFRAMES = SUBMINUTE_TIMEFRAMES + ["1m"]
+
+
+class Indicator:
+    """Base class: committed state covers closed bars, the open bar is
+    recomputed on every tick from that state without mutating it."""
+
+    kind = ""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.points: Deque[dict] = deque(maxlen=MAX_CANDLES)
+        self._open_time: Optional[int] = None
+        self._open_close = 0.0
+
+    def update(self, bar: CandleBar) -> Optional[dict]:
+        if self._open_time is not None and bar.time < self._open_time:
+            return None  # late update for a bar we already closed
+        if bar.time != self._open_time:
+            if self._open_time is not None:
+                self._commit(self._open_close)
+            self._open_time = bar.time
+        self._open_close = bar.close
+
+        point = self._compute(bar.close)
+        if point is None:
+            return None
+        point["time"] = bar.time
+        if self.points and self.points[-1]["time"] == bar.time:
+            self.points[-1] = point
+        else:
+            self.points.append(point)
+        return point
+
+    def seed(self, bars: Iterable[CandleBar]):
+        for bar in bars:
+            self.update(bar)
+
+    def _compute(self, close: float) -> Optional[dict]:
+        raise NotImplementedError
+
+    def _commit(self, close: float):
+        raise NotImplementedError
+
+
+class EMA(Indicator):
+    """SMA-seeded exponential moving average."""
+
+    kind = "ema"
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self._k = 2.0 / (period + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._ema = 0.0
+
+    def _compute(self, close: float) -> Optional[dict]:
+        n = self._count + 1
+        if n < self.period:
+            return None
+        if n == self.period:
+            return {"value": (self._sum + close) / self.period}
+        return {"value": close * self._k + self._ema * (1 - self._k)}
+
+    def _commit(self, close: float):
+        self._count += 1
+        if self._count < self.period:
+            self._sum += close
+        elif self._count == self.period:
+            self._ema = (self._sum + close) / self.period
+        else:
+            self._ema = close * self._k + self._ema * (1 - self._k)
+
+
+class RSI(Indicator):
+    """Wilder-smoothed relative strength index."""
+
+    kind = "rsi"
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self._prev_close: Optional[float] = None
+        self._count = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    def _averages(self, close: float) -> Optional[Tuple[float, float]]:
+        if self._prev_close is None:
+            return None
+        delta = close - self._prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        n = self._count + 1
+        if n < self.period:
+            # Warm-up: _avg_* hold running sums until the first full window
+            return None
+        if n == self.period:
+            return (self._avg_gain + gain) / self.period, (self._avg_loss + loss) / self.period
+        p = self.period
+        return (self._avg_gain * (p - 1) + gain) / p, (self._avg_loss * (p - 1) + loss) / p
+
+    def _compute(self, close: float) -> Optional[dict]:
+        averages = self._averages(close)
+        if averages is None:
+            return None
+        avg_gain, avg_loss = averages
+        if avg_loss == 0:
+            return {"value": 100.0}
+        return {"value": 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)}
+
+    def _commit(self, close: float):
+        if self._prev_close is not None:
+            averages = self._averages(close)
+            self._count += 1
+            if averages is None:
+                delta = close - self._prev_close
+                self._avg_gain += max(delta, 0.0)
+                self._avg_loss += max(-delta, 0.0)
+            else:
+                self._avg_gain, self._avg_loss = averages
+        self._prev_close = close
+
+
+class Bollinger(Indicator):
+    """SMA ± BOLLINGER_STDDEV population standard deviations."""
+
+    kind = "bb"
+
+    def __init__(self, period: int):
+        super().__init__(period)
+        self._window: Deque[float] = deque(maxlen=period - 1)
+        self._sum = 0.0
+
+    def _compute(self, close: float) -> Optional[dict]:
+        if len(self._window) < self.period - 1:
+            return None
+        mean = (self._sum + close) / self.period
+        var = (close - mean) ** 2
+        for value in self._window:
+            var += (value - mean) ** 2
+        band = BOLLINGER_STDDEV * math.sqrt(var / self.period)
+        return {"middle": mean, "upper": mean + band, "lower": mean - band}
+
+    def _commit(self, close: float):
+        if len(self._window) == self._window.maxlen:
+            self._sum -= self._window[0]
+        self._window.append(close)
+        self._sum += close
+
+
+INDICATORS = {cls.kind: cls for cls in (EMA, RSI, Bollinger)}
+
+
+def parse_key(spec: str, live: bool = False) -> Tuple[str, str, int]:
+    """'1m:ema:20' → ('1m', 'ema', 20). Raises ValueError on bad input, or
+    with `live` on a timeframe that never receives live candles."""
+    tf, kind, period = spec.split(":")
+    kind = kind.lower()
+    if tf not in TIMEFRAME_SECONDS:
+        raise ValueError(f"unknown timeframe {tf!r}")
+    if live and tf not in LIVE_TIMEFRAMES:
+        raise ValueError(f"no live candles for {tf!r}, expected one of {', '.join(LIVE_TIMEFRAMES)}")
+    if kind not in INDICATORS:
+        raise ValueError(f"unknown indicator {kind!r}")
+    n = int(period)
+    if not MIN_PERIOD <= n <= MAX_PERIOD:
+        raise ValueError(f"period must be between {MIN_PERIOD} and {MAX_PERIOD}")
+    return tf, kind, n
+
+
+def make_key(tf: str, kind: str, period: int) -> str:
+    return f"{tf}:{kind}:{period}"
+
+
+def build(kind: str, period: int, bars: Iterable[CandleBar] = ()) -> Indicator:
+    indicator = INDICATORS[kind](period)
+    indicator.seed(bars)
+    return indicator
+
+
+class IndicatorHub:
+    """Ref-counted registry of live indicator instances.
+
+    acquire/release run on the serving loop while on_candle runs on the feed
+    thread, so all access goes through one lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances: Dict[Tuple[str, str], Indicator] = {}
+        self._refs: Dict[Tuple[str, str], int] = {}
+        # (coin, tf) -> {key: indicator}, so a candle only touches its own series
+        self._by_series: Dict[Tuple[str, str], Dict[str, Indicator]] = {}
+
+    def acquire(self, coin: str, key: str) -> Indicator:
+        tf, kind, period = parse_key(key, live=True)
+        with self._lock:
+            ident = (coin, key)
+            indicator = self._instances.get(ident)
+            if indicator is None:
+                indicator = build(kind, period, list(store[coin].candles[tf]))
+                self._instances[ident] = indicator
+                self._by_series.setdefault((coin, tf), {})[key] = indicator
+            self._refs[ident] = self._refs.get(ident, 0) + 1
+            return indicator
+
+    def release(self, coin: str, key: str):
+        tf = key.split(":", 1)[0]
+        with self._lock:
+            ident = (coin, key)
+            refs = self._refs.get(ident, 0) - 1
+            if refs > 0:
+                self._refs[ident] = refs
+                return
+            self._refs.pop(ident, None)
+            self._instances.pop(ident, None)
+            series = self._by_series.get((coin, tf))
+            if series is not None:
+                series.pop(key, None)
+                if not series:
+                    del self._by_series[(coin, tf)]
+
+    def points(self, coin: str, key: str) -> Optional[List[dict]]:
+        with self._lock:
+            indicator = self._instances.get((coin, key))
+            return list(indicator.points) if indicator is not None else None
+
+    def memory_bytes(self, deque_bytes) -> int:
+        with self._lock:
+            return sum(deque_bytes(indicator.points) for indicator in self._instances.values())
+
+    def reseed(self, coin: str, tf: str, bars: List[CandleBar], since: int) -> List[Tuple[str, dict]]:
+        """Rebuild every live indicator on (coin, tf) from `bars` after a past
+        bar changed; returns (key, point) for the points from `since` on."""
+        series = self._by_series.get((coin, tf))
+        if not series:
+            return []
+        updates = []
+        with self._lock:
+            for key, indicator in list(series.items()):
+                fresh = build(indicator.kind, indicator.period, bars)
+                series[key] = self._instances[(coin, key)] = fresh
+                updates.extend((key, point) for point in fresh.points if point["time"] >= since)
+        return updates
+
+    def on_candle(self, coin: str, tf: str, bar: CandleBar) -> List[Tuple[str, dict]]:
+        """Advance every live indicator on (coin, tf); returns (key, point) updates."""
+        series = self._by_series.get((coin, tf))
+        if not series:
+            return []
+        updates = []
+        with self._lock:
+            for key, indicator in series.items():
+                point = indicator.update(bar)
+                if point is not None:
+                    updates.append((key, point))
+        return updates
+
+
+# Global registry — one shared instance per (coin, tf, kind, period)
+indicator_hub = IndicatorHub()
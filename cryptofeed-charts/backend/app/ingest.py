@@ -0,0 +1,180 @@
+"""
+Sharded ingestion: INGEST_WORKERS > 1 splits the coins across worker
+processes, each running its own FeedHandler (websockets, book maintenance,
+normalization). Workers send normalized (kind, coin, payload) events in
+batches over a pipe; one merge thread in the serving process applies them to
+the store and broadcasts, exactly as the in-process callbacks do.
+A busy BTC book then only costs its own worker's core.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import List, Optional, Tuple
+
+from . import profiling
+from .feed_manager import EVENTS, _run_feed_sync, bind_feed_loop, bind_serving_loop, build_feed_handler
+from .store import COINS
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "0"))
+BATCH_SIZE = 256  # events per pipe message at most
+RESTART_DELAY = 5.0
+
+_APPLY = {kind: apply for kind, (_, apply, _) in EVENTS.items()}
+
+# spawn, not fork: the serving process already runs threads and an event loop
+_mp = multiprocessing.get_context("spawn")
+
+
+def partition(coins: List[str], workers: int) -> List[List[str]]:
+    """Round-robin over COINS (most active first), so the hottest coins land
+    on different workers."""
+    shards: List[List[str]] = [[] for _ in range(min(workers, len(coins)))]
+    for i, coin in enumerate(coins):
+        shards[i % len(shards)].append(coin)
+    return shards
+
+
+# ── Worker process ───────────────────────────────────────────
+
+
+class _Outbox:
+    """Collects events produced during one loop iteration and sends them as a
+    single pipe message, so a burst of book updates costs one syscall."""
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.events: List[Tuple[str, str, object]] = []
+
+    def put(self, kind: str, coin: str, payload):
+        self.events.append((kind, coin, payload))
+        if len(self.events) >= BATCH_SIZE:
+            self.flush()
+        elif len(self.events) == 1:
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        if self.events:
+            events, self.events = self.events, []
+            self.conn.send(events)
+
+
+def _forwarder(kind: str, outbox: _Outbox):
+    normalize = EVENTS[kind][0]
+
+    async def callback(obj, receipt_timestamp):
+        coin, payload = normalize(obj)
+        outbox.put(kind, coin, payload)
+
+    return callback
+
+
+def _worker_main(shard: int, coins: List[str], conn: Connection):
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s  %(levelname)-8s  ingest[{shard}]  %(name)s  %(message)s",
+    )
+    outbox = _Outbox(conn)
+    fh = build_feed_handler(coins, callbacks={kind: _forwarder(kind, outbox) for kind in EVENTS})
+    logger.info("Ingest worker %d running %s", shard, ", ".join(coins))
+    _run_feed_sync(fh)
+
+
+# ── Serving process ──────────────────────────────────────────
+
+
+class _Worker:
+    def __init__(self, shard: int, coins: List[str]):
+        self.shard = shard
+        self.coins = coins
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        self.restarts = 0
+
+    def start(self) -> Connection:
+        parent, child = _mp.Pipe(duplex=False)
+        self.process = _mp.Process(
+            target=_worker_main, args=(self.shard, self.coins, child), name=f"ingest-{self.shard}", daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.conn = parent
+        return parent
+
+    def stop(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=5)
+
+
+class ShardedIngest:
+    def __init__(self, workers: int):
+        self.workers = [_Worker(i, coins) for i, coins in enumerate(partition(COINS, workers))]
+        self.events = 0
+        self._merge_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # Merge thread: its own loop, like the in-process feed thread, so the
+    # apply steps' timers and cross-thread fan-out behave the same way.
+
+    def _merge_thread(self, ready: threading.Event):
+        profiling.register_thread("merge")
+        loop = self._merge_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        bind_feed_loop(loop)
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _watch(self, conn: Connection):
+        self._merge_loop.add_reader(conn.fileno(), self._drain, conn)
+
+    def _drain(self, conn: Connection):
+        try:
+            while conn.poll():
+                self._merge_loop.create_task(self._apply(conn.recv()))
+        except (EOFError, OSError):
+            # Worker went away; the supervisor restarts it
+            self._merge_loop.remove_reader(conn.fileno())
+            conn.close()
+
+    async def _apply(self, events: List[Tuple[str, str, object]]):
+        start = time.perf_counter()
+        for kind, coin, payload in events:
+            await _APPLY[kind](coin, payload)
+        self.events += len(events)
+        profiling.record("ingest_merge", time.perf_counter() - start)
+
+    async def run(self):
+        bind_serving_loop()
+        ready = threading.Event()
+        threading.Thread(target=self._merge_thread, args=(ready,), name="ingest-merge", daemon=True).start()
+        ready.wait()
+        for worker in self.workers:
+            conn = worker.start()
+            self._merge_loop.call_soon_threadsafe(self._watch, conn)
+        logger.info("Sharded ingest: %s", "; ".join(",".join(w.coins) for w in self.workers))
+        try:
+            while True:
+                await asyncio.sleep(RESTART_DELAY)
+                for worker in self.workers:
+                    if not worker.process.is_alive():
+                        worker.restarts += 1
+                        logger.warning("Ingest worker %d exited (%s), restarting", worker.shard, worker.process.exitcode)
+                        conn = worker.start()
+                        self._merge_loop.call_soon_threadsafe(self._watch, conn)
+        finally:
+            for worker in self.workers:
+                worker.stop()
+            self._merge_loop.call_soon_threadsafe(self._merge_loop.stop)
+
+
+async def run_sharded(workers: int = INGEST_WORKERS):
+    """Started from the FastAPI lifespan instead of run_feed()."""
+    await ShardedIngest(workers).run()
@@ -6,11 +6,26 @@ import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from . import readiness
 
-from .feed_manager import run_feed
-from .routers.ws import router
+with readiness.phase("import_app"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
+
+    from .alerts import alert_engine
+    from .feed_manager import run_feed
+    from .history import SEED_TIMEFRAME, seed_store
+    from .ingest import INGEST_WORKERS, run_sharded
+    from .memory import governor
+    from .overview import overview
+    from .routers.admin import router as admin_router
+    from .routers.alerts import router as alerts_router
+    from .routers.overview import router as overview_router
+    from .routers.sse import router as sse_router
+    from .routers.ws import router
+    from .state_transfer import BOOTSTRAP_PEER, bootstrap_from_peer
+    from .store import COINS
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,30 +36,70 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Start cryptofeed in a background task
-    feed_task = asyncio.create_task(run_feed())
+    # Start cryptofeed in a background task, sharded across processes if configured
+    if BOOTSTRAP_PEER:
+        readiness.hold("peer_bootstrap")
+    feed_task = asyncio.create_task(run_sharded() if INGEST_WORKERS > 1 else run_feed())
     logger.info("cryptofeed FeedHandler started")
+    seed_task = asyncio.create_task(_seed())
+    governor_task = asyncio.create_task(governor.run())
+    overview_task = asyncio.create_task(overview.run())
+    alerts_task = asyncio.create_task(alert_engine.run())
+    readiness.mark("serving")
     yield
-    feed_task.cancel()
-    try:
-        await feed_task
-    except (asyncio.CancelledError, Exception):
-        pass
+    for task in (alerts_task, overview_task, governor_task, seed_task, feed_task):
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
     logger.info("cryptofeed FeedHandler stopped")
 
 
+async def _seed():
+    coins = COINS
+    if BOOTSTRAP_PEER:
+        # Warm from a running instance first; REST only for what it lacked
+        try:
+            with readiness.phase("peer_bootstrap"):
+                restored = await bootstrap_from_peer()
+        finally:
+            readiness.release("peer_bootstrap")
+        coins = [coin for coin in COINS if SEED_TIMEFRAME not in restored.get(coin, ())]
+    if coins:
+        with readiness.phase("seed_candles"):
+            await seed_store(coins=coins)
+
+
 app = FastAPI(title="Cryptofeed Charts API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # tighten in production if needed
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST", "DELETE"],
     allow_headers=["*"],
 )
 
+app.include_router(overview_router)  # before /ws/{coin}
 app.include_router(router)
+app.include_router(sse_router)
+app.include_router(admin_router)
+app.include_router(alerts_router)
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """200 once every coin's store is warm, 503 before; includes startup phases."""
+    report = readiness.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/memory")
+async def memory():
+    """Per-component memory usage against MEMORY_BUDGET_MB."""
+    return governor.report()
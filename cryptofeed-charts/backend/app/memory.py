@@ -0,0 +1,256 @@
+"""
+Memory accounting and budget governor.
+Estimates what each component holds (candle / trade buffers, client queues,
+indicator caches) and, when the process nears MEMORY_BUDGET_MB, shrinks the
+history of the least-watched coins and the per-client queue size. Capacity is
+given back, most-watched coin first, once usage falls under the low watermark.
+
+Usage is the accounted buffers plus the process overhead beyond them (RSS
+minus accounted), sampled while nothing is shrunk and frozen after that: RSS
+itself does not drop when buffers shrink, since the allocator keeps the pages.
+"""
+import asyncio
+import gc
+import logging
+import os
+import sys
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from .feed_manager import call_on_feed_loop, replay_buffers, subscriber_count, subscriber_queues
+from .footprint import footprints
+from .heatmap import heatmaps
+from .indicators import indicator_hub
+from .store import COINS, MAX_CANDLES, MAX_TRADES, store
+from .trade_bars import trade_bars
+from .volume_profile import volume_profiles
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BUDGET_MB = int(os.environ.get("MEMORY_BUDGET_MB", "400"))
+HIGH_WATERMARK = 0.90  # start shrinking above this share of the budget
+LOW_WATERMARK = 0.70   # give capacity back below this share
+CHECK_INTERVAL = 5.0
+
+MIN_CANDLES = 100
+MIN_TRADES = 20
+MAX_QUEUE_SIZE = 200
+MIN_QUEUE_SIZE = 50
+
+
+class ResizableQueue(asyncio.Queue):
+    """asyncio.Queue whose bound can change while clients are attached."""
+
+    def resize(self, maxsize: int):
+        # Never below what is already queued, so shrinking alone evicts nobody
+        self._maxsize = max(maxsize, self.qsize())
+
+
+def _object_size(obj) -> int:
+    """Shallow size of a slotted object or dict plus its direct values."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return size + sum(sys.getsizeof(v) for v in obj.values())
+    for name in getattr(type(obj), "__slots__", ()):
+        size += sys.getsizeof(getattr(obj, name, None))
+    return size
+
+
+def deque_bytes(items: Deque) -> int:
+    """Container size + len × size of the newest element (entries are uniform)."""
+    if not items:
+        return sys.getsizeof(items)
+    return sys.getsizeof(items) + len(items) * _object_size(items[-1])
+
+
+def rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+# ── Component sizers ─────────────────────────────────────────
+
+
+def _candles_bytes() -> int:
+    return sum(deque_bytes(q) for cs in store.values() for q in list(cs.candles.values()))
+
+
+def _trades_bytes() -> int:
+    return sum(
+        deque_bytes(cs.trades) + deque_bytes(cs.agg_trades) + deque_bytes(cs.liquidations)
+        for cs in store.values()
+    )
+
+
+def _coin_queues() -> List[asyncio.Queue]:
+    return [q for coin in COINS for q in subscriber_queues(coin)]
+
+
+# Every set of client queues the governor bounds (coin streams, /ws/overview)
+_queue_sources: List[Callable[[], Iterable[asyncio.Queue]]] = [_coin_queues]
+
+
+def register_queues(source: Callable[[], Iterable[asyncio.Queue]]):
+    """Let other modules put their client queues under the queue size bound."""
+    _queue_sources.append(source)
+
+
+def _client_queues() -> List[asyncio.Queue]:
+    return [q for source in _queue_sources for q in source()]
+
+
+def _client_queues_bytes() -> int:
+    return sum(deque_bytes(q._queue) for q in _client_queues())  # type: ignore[attr-defined]
+
+
+def _replay_bytes() -> int:
+    total = 0
+    for buffer in replay_buffers():
+        if buffer:
+            seq, frame = buffer[-1]
+            total += sys.getsizeof(buffer) + len(buffer) * (sys.getsizeof((seq, frame)) + sys.getsizeof(frame))
+    return total
+
+
+def _indicators_bytes() -> int:
+    return indicator_hub.memory_bytes(deque_bytes)
+
+
+def _volume_profile_bytes() -> int:
+    return sum(profile.memory_bytes() for profile in volume_profiles.values())
+
+
+def _footprint_bytes() -> int:
+    return sum(series.memory_bytes() for series in footprints.values())
+
+
+def _heatmap_bytes() -> int:
+    return sum(deque_bytes(heatmap.columns) for heatmap in heatmaps.values())
+
+
+def _trade_bars_bytes() -> int:
+    return sum(deque_bytes(s.bars) for builder in trade_bars.values() for s in builder.series.values())
+
+
+_components: Dict[str, Callable[[], int]] = {
+    "candles": _candles_bytes,
+    "trades": _trades_bytes,
+    "client_queues": _client_queues_bytes,
+    "replay": _replay_bytes,
+    "indicators": _indicators_bytes,
+    "volume_profile": _volume_profile_bytes,
+    "footprint": _footprint_bytes,
+    "heatmap": _heatmap_bytes,
+    "trade_bars": _trade_bars_bytes,
+}
+
+
+def register_component(name: str, sizer: Callable[[], int]):
+    """Let other modules report their buffers in /memory."""
+    _components[name] = sizer
+
+
+class MemoryGovernor:
+    def __init__(self, budget_mb: int = MEMORY_BUDGET_MB):
+        self.budget = budget_mb * 1024 * 1024
+        self.candle_capacity: Dict[str, int] = {coin: MAX_CANDLES for coin in COINS}
+        self.queue_size = MAX_QUEUE_SIZE
+        self.actions: Deque[dict] = deque(maxlen=20)
+        self.overhead = 0  # process bytes beyond the accounted buffers
+
+    def usage(self) -> Dict[str, int]:
+        return {name: sizer() for name, sizer in _components.items()}
+
+    @property
+    def shrunk(self) -> bool:
+        return self.queue_size < MAX_QUEUE_SIZE or any(c < MAX_CANDLES for c in self.candle_capacity.values())
+
+    def used_bytes(self, usage: Optional[Dict[str, int]] = None) -> int:
+        accounted = sum((usage or self.usage()).values())
+        rss = rss_bytes()
+        if rss is not None and not self.shrunk:
+            self.overhead = max(0, rss - accounted)
+        return accounted + self.overhead
+
+    def check(self) -> Optional[str]:
+        pressure = self.used_bytes() / self.budget
+        action = None
+        if pressure > HIGH_WATERMARK:
+            action = self._shrink()
+            if action:
+                # Once per shrink step, not per tick: a full pass stalls the
+                # serving loop, and sustained pressure is when that hurts most
+                gc.collect()
+        elif pressure < LOW_WATERMARK:
+            action = self._relax()
+        if action:
+            logger.warning("Memory governor (%.0f%% of budget): %s", pressure * 100, action)
+            self.actions.append({"time": int(time.time()), "pressure": round(pressure, 3), "action": action})
+        return action
+
+    def _shrink(self) -> Optional[str]:
+        for coin in sorted(COINS, key=subscriber_count):
+            capacity = self.candle_capacity[coin]
+            if capacity > MIN_CANDLES:
+                return self._set_capacity(coin, max(MIN_CANDLES, capacity // 2))
+        if self.queue_size > MIN_QUEUE_SIZE:
+            return self._set_queue_size(max(MIN_QUEUE_SIZE, self.queue_size // 2))
+        return None
+
+    def _relax(self) -> Optional[str]:
+        if self.queue_size < MAX_QUEUE_SIZE:
+            return self._set_queue_size(min(MAX_QUEUE_SIZE, self.queue_size * 2))
+        for coin in sorted(COINS, key=subscriber_count, reverse=True):
+            capacity = self.candle_capacity[coin]
+            if capacity < MAX_CANDLES:
+                return self._set_capacity(coin, min(MAX_CANDLES, capacity * 2))
+        return None
+
+    def _set_capacity(self, coin: str, capacity: int) -> str:
+        self.candle_capacity[coin] = capacity
+        trades = max(MIN_TRADES, MAX_TRADES * capacity // MAX_CANDLES)
+        call_on_feed_loop(store[coin].resize, capacity, trades)
+        return f"{coin} history → {capacity} candles / {trades} trades"
+
+    def _set_queue_size(self, size: int) -> str:
+        self.queue_size = size
+        for q in _client_queues():
+            if isinstance(q, ResizableQueue):
+                q.resize(size)
+        return f"client queue size → {size}"
+
+    def report(self) -> dict:
+        usage = self.usage()
+        return {
+            "budget_bytes": self.budget,
+            "used_bytes": self.used_bytes(usage),
+            "rss_bytes": rss_bytes(),
+            "accounted_bytes": sum(usage.values()),
+            "overhead_bytes": self.overhead,
+            "components": usage,
+            "coins": {
+                coin: {
+                    "subscribers": subscriber_count(coin),
+                    "candle_capacity": self.candle_capacity[coin],
+                }
+                for coin in COINS
+            },
+            "queue_size": self.queue_size,
+            "recent_actions": list(self.actions),
+        }
+
+    async def run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("Memory governor check failed: %s", e)
+            await asyncio.sleep(CHECK_INTERVAL)
+
+
+# Global governor — started from the FastAPI lifespan
+governor = MemoryGovernor()
@@ -0,0 +1,131 @@
+"""
+All-coins overview document for dashboards (/snapshot, /ws/overview).
+Latest price, spread, funding, OI and 24h change for every coin in one
+versioned, pre-encoded document. Rows are compared against the previous build
+once per OVERVIEW_INTERVAL; the JSON is re-encoded and pushed only when a field
+actually changed.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Set, Tuple
+
+import httpx
+
+from .feed_manager import EPOCH
+from .history import fetch_candles
+from .memory import ResizableQueue, governor, register_queues
+from .store import COINS, CoinStore, store
+
+logger = logging.getLogger(__name__)
+
+OVERVIEW_INTERVAL = 1.0
+REFERENCE_REFRESH = 3600.0  # 24h-ago reference opens are hourly
+REFERENCE_RETRY = 60.0
+
+
+def _price(snap: CoinStore) -> float:
+    if snap.trades:
+        return snap.trades[-1].price
+    if snap.candles["1m"]:
+        return snap.candles["1m"][-1].close
+    return 0.0
+
+
+def _row(snap: CoinStore, ref_open: float) -> Tuple:
+    price = _price(snap)
+    change = round((price / ref_open - 1) * 100, 3) if price and ref_open else None
+    return (
+        price,
+        snap.book.bid,
+        snap.book.ask,
+        snap.book.spread,
+        snap.funding.rate,
+        snap.funding.next_funding_time,
+        snap.open_interest.open_interest,
+        change,
+    )
+
+
+ROW_FIELDS = ("price", "bid", "ask", "spread", "funding_rate", "next_funding_time", "open_interest", "change_24h")
+
+
+class Overview:
+    def __init__(self):
+        self.version = 0
+        self.body = ""   # the document, served by /snapshot
+        self.frame = ""  # the document wrapped as a stream message
+        self._rows: Dict[str, Tuple] = {}
+        self._ref_open: Dict[str, float] = {coin: 0.0 for coin in COINS}
+        self._ref_fetched = float("-inf")
+        self._queues: Set[ResizableQueue] = set()
+        register_queues(lambda: list(self._queues))
+        self.rebuild()
+
+    @property
+    def etag(self) -> str:
+        return f'"{EPOCH}-{self.version}"'
+
+    def rebuild(self) -> bool:
+        """Re-encode the document if any row changed. Returns True on change."""
+        rows = {coin: _row(store[coin], self._ref_open[coin]) for coin in COINS}
+        if rows == self._rows and self.body:
+            return False
+        self._rows = rows
+        self.version += 1
+        doc = {
+            "version": self.version,
+            "epoch": EPOCH,
+            "time": int(time.time() * 1000),
+            "coins": {coin: dict(zip(ROW_FIELDS, row)) for coin, row in rows.items()},
+        }
+        self.body = json.dumps(doc)
+        self.frame = json.dumps({"type": "overview", "data": doc})
+        return True
+
+    # ── /ws/overview subscribers ─────────────────────────────
+
+    def subscribe(self) -> ResizableQueue:
+        q = ResizableQueue(maxsize=governor.queue_size)
+        self._queues.add(q)
+        return q
+
+    def unsubscribe(self, q: ResizableQueue):
+        self._queues.discard(q)
+
+    def _publish(self):
+        for q in list(self._queues):
+            try:
+                q.put_nowait(self.frame)
+            except asyncio.QueueFull:
+                # Drop the client; its sender sees None and closes
+                self._queues.discard(q)
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(None)
+
+    async def _refresh_reference(self, client: httpx.AsyncClient):
+        results = await asyncio.gather(*(fetch_candles(coin, "1h", 24, client) for coin in COINS))
+        for coin, candles in zip(COINS, results):
+            if candles:
+                self._ref_open[coin] = candles[0]["open"]
+        self._ref_fetched = time.monotonic()
+        if not all(results):
+            self._ref_fetched -= REFERENCE_REFRESH - REFERENCE_RETRY
+
+    async def run(self):
+        async with httpx.AsyncClient(timeout=10) as client:
+            while True:
+                try:
+                    if time.monotonic() - self._ref_fetched > REFERENCE_REFRESH:
+                        await self._refresh_reference(client)
+                    if self.rebuild():
+                        self._publish()
+                except Exception as e:
+                    logger.error("Overview rebuild failed: %s", e)
+                await asyncio.sleep(OVERVIEW_INTERVAL)
+
+
+# Global overview — rebuilt from the FastAPI lifespan
+overview = Overview()
@@ -0,0 +1,195 @@
+"""
+In-process diagnostics: a sampling profiler that emits collapsed stacks
+(flamegraph.pl / speedscope input), tracemalloc snapshots and diffs, and
+cumulative timings for the feed callbacks and stream sender loops.
+Everything is toggled at runtime through the admin router.
+"""
+import asyncio
+import functools
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+MAX_PROFILE_SECONDS = 60.0
+MIN_INTERVAL = 0.001
+
+
+class CallbackStats:
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_us": round(self.total / self.calls * 1e6, 2) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+callback_stats: Dict[str, CallbackStats] = {}
+
+
+def record(name: str, elapsed: float):
+    stats = callback_stats.get(name)
+    if stats is None:
+        stats = callback_stats[name] = CallbackStats()
+    stats.add(elapsed)
+
+
+def timed(name: str):
+    """Accumulate wall time of an async callback under `name`."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def callback_report(reset: bool = False) -> dict:
+    report = {name: stats.to_dict() for name, stats in sorted(callback_stats.items())}
+    if reset:
+        callback_stats.clear()
+    return report
+
+
+# ── Sampling profiler ────────────────────────────────────────
+
+# Threads worth profiling by name; filled in as they start
+threads: Dict[str, int] = {}
+_profile_lock = threading.Lock()
+
+
+def register_thread(name: str):
+    threads[name] = threading.get_ident()
+
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def sample(seconds: float, interval: float, thread_ids: Optional[List[int]] = None) -> str:
+    """Sample stacks of the given threads (all but this one by default) and
+    return them in collapsed-stack format: 'frame;frame;frame count'."""
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("a profile is already running")
+    try:
+        seconds = min(seconds, MAX_PROFILE_SECONDS)
+        interval = max(interval, MIN_INTERVAL)
+        me = threading.get_ident()
+        names = {ident: name for name, ident in threads.items()}
+        counts: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (thread_ids is not None and ident not in thread_ids):
+                    continue
+                counts[f"{names.get(ident, ident)};{_collapse(frame)}"] += 1
+            time.sleep(interval)
+        return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+    finally:
+        _profile_lock.release()
+
+
+async def profile(seconds: float, interval: float, thread: Optional[str] = None) -> str:
+    thread_ids = None
+    if thread is not None:
+        if thread not in threads:
+            raise KeyError(thread)
+        thread_ids = [threads[thread]]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, sample, seconds, interval, thread_ids)
+
+
+# ── tracemalloc ──────────────────────────────────────────────
+
+_baseline: Optional[tracemalloc.Snapshot] = None
+
+
+def _stat_dict(stat) -> dict:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+
+
+def _diff_dict(stat) -> dict:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_diff_bytes": stat.size_diff,
+        "count_diff": stat.count_diff,
+        "size_bytes": stat.size,
+    }
+
+
+def tracemalloc_start(frames: int = 10) -> dict:
+    global _baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        _baseline = None
+    return tracemalloc_status()
+
+
+def tracemalloc_stop() -> dict:
+    global _baseline
+    tracemalloc.stop()
+    _baseline = None
+    return tracemalloc_status()
+
+
+def tracemalloc_status() -> dict:
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+    return {"tracing": tracing, "current_bytes": current, "peak_bytes": peak, "has_baseline": _baseline is not None}
+
+
+def tracemalloc_snapshot(limit: int = 25) -> dict:
+    """Top allocation sites now; the snapshot becomes the baseline for diffs."""
+    global _baseline
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    _baseline = tracemalloc.take_snapshot()
+    stats = _baseline.statistics("lineno")[:limit]
+    return {**tracemalloc_status(), "top": [_stat_dict(s) for s in stats]}
+
+
+def tracemalloc_diff(limit: int = 25) -> dict:
+    """Growth since the baseline snapshot; the new snapshot replaces it."""
+    global _baseline
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    if _baseline is None:
+        raise RuntimeError("take a snapshot first")
+    current = tracemalloc.take_snapshot()
+    stats = current.compare_to(_baseline, "lineno")[:limit]
+    _baseline = current
+    return {**tracemalloc_status(), "top": [_diff_dict(s) for s in stats]}
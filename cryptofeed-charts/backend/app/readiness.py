@@ -0,0 +1,74 @@
+"""
+Startup timing and readiness.
+/health only says the process is up; /ready turns green once every coin's
+store is warm (1m candles present, first book received) and no startup step
+holds it back (e.g. a peer state bootstrap), so rolling deploys do not route
+traffic to empty instances.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Set
+
+from .store import COINS, store
+
+STARTED = time.monotonic()
+
+# phase -> {"start": seconds since STARTED, "duration": seconds}
+_phases: Dict[str, dict] = {}
+_ready = False
+_holds: Set[str] = set()
+
+
+def _elapsed() -> float:
+    return round(time.monotonic() - STARTED, 3)
+
+
+@contextmanager
+def phase(name: str):
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        _phases[name] = {
+            "start": round(start - STARTED, 3),
+            "duration": round(time.monotonic() - start, 3),
+        }
+
+
+def mark(name: str):
+    """Record the first time an event happens (e.g. first_book:BTC)."""
+    if name not in _phases:
+        _phases[name] = {"start": _elapsed(), "duration": 0.0}
+
+
+def hold(name: str):
+    """Keep /ready red until release(name), whatever the stores look like."""
+    _holds.add(name)
+
+
+def release(name: str):
+    _holds.discard(name)
+
+
+def coin_status(coin: str) -> Dict[str, bool]:
+    cs = store[coin]
+    # A book restored from a peer dump does not count until the live feed updates it
+    return {"candles": bool(cs.candles["1m"]), "book": cs.book.bid > 0 and cs.book.ask > 0 and not cs.book.restored}
+
+
+def is_ready() -> bool:
+    global _ready
+    if not _ready and not _holds and all(all(coin_status(coin).values()) for coin in COINS):
+        _ready = True
+        mark("ready")
+    return _ready
+
+
+def report() -> dict:
+    return {
+        "ready": is_ready(),
+        "uptime": _elapsed(),
+        "waiting_for": sorted(_holds),
+        "coins": {coin: coin_status(coin) for coin in COINS},
+        "phases": dict(sorted(_phases.items(), key=lambda item: item[1]["start"])),
+    }
@@ -0,0 +1,102 @@
+"""
+Admin diagnostics: /admin/*
+Disabled unless ADMIN_TOKEN is set; every request must carry it in the
+X-Admin-Token header.
+"""
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from .. import profiling, readiness
+from ..admission import admission
+from ..state_transfer import export_state
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+
+def is_admin(token: str) -> bool:
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: str = Header(default="")):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404)
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(default=10.0, gt=0, le=profiling.MAX_PROFILE_SECONDS),
+    interval: float = Query(default=0.005, ge=profiling.MIN_INTERVAL),
+    thread: str = Query(default=None, description="serving | feed; all threads when omitted"),
+):
+    """Time-boxed sampling profile as collapsed stacks (feed to flamegraph.pl
+    or speedscope)."""
+    try:
+        folded = await profiling.profile(seconds, interval, thread)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"unknown thread, expected one of {sorted(profiling.threads)}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(
+        folded,
+        headers={"Content-Disposition": 'attachment; filename="profile.folded"'},
+    )
+
+
+@router.get("/callbacks")
+async def callbacks(reset: bool = False):
+    """Cumulative time per feed callback and stream sender."""
+    return profiling.callback_report(reset=reset)
+
+
+@router.get("/connections")
+async def connections():
+    """Open streams against the admission caps, busiest addresses, rejections."""
+    return admission.report()
+
+
+@router.get("/state")
+async def state():
+    """Binary dump of every coin's store for a booting peer (BOOTSTRAP_PEER);
+    503 until this instance is warm itself."""
+    if not readiness.is_ready():
+        raise HTTPException(status_code=503, detail="not ready")
+    return StreamingResponse(export_state(), media_type="application/octet-stream")
+
+
+@router.get("/tracemalloc")
+async def tracemalloc_status():
+    return profiling.tracemalloc_status()
+
+
+@router.post("/tracemalloc/start")
+async def tracemalloc_start(frames: int = Query(default=10, ge=1, le=50)):
+    return profiling.tracemalloc_start(frames)
+
+
+@router.post("/tracemalloc/stop")
+async def tracemalloc_stop():
+    return profiling.tracemalloc_stop()
+
+
+@router.post("/tracemalloc/snapshot")
+async def tracemalloc_snapshot(limit: int = Query(default=25, le=200)):
+    try:
+        return profiling.tracemalloc_snapshot(limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/tracemalloc/diff")
+async def tracemalloc_diff(limit: int = Query(default=25, le=200)):
+    try:
+        return profiling.tracemalloc_diff(limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
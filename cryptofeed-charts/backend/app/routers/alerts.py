@@ -0,0 +1,73 @@
+"""
+Alert rules: POST /alerts, GET /alerts, DELETE /alerts/{id}.
+Triggers arrive on /ws/{coin}?channels=alert (or /stream/{coin}) and, for
+rules with a webhook URL, as a POST to that URL.
+Creating a rule returns its `secret`; deleting it takes that secret in
+X-Alert-Secret (or the admin token). Webhook rules and the rule listing
+need X-Admin-Token; other callers hold at most MAX_RULES_PER_CLIENT live
+rules per address.
+"""
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from ..admission import client_ip
+from ..alerts import alert_engine, check_webhook
+from ..feed_manager import publish_alerts
+from .admin import is_admin, require_admin
+
+router = APIRouter()
+
+
+class AlertRequest(BaseModel):
+    coin: str
+    metric: str           # price | spread | funding | liq_notional
+    op: str = "above"     # above | below (crossing direction)
+    threshold: float
+    window: int = 60      # seconds, liq_notional only
+    once: bool = True     # remove the rule after it fires
+    webhook: Optional[str] = None
+    note: Optional[str] = None
+
+
+@router.post("/alerts")
+async def create_alert(req: AlertRequest, request: Request, x_admin_token: str = Header(default="")):
+    admin = is_admin(x_admin_token)
+    if req.webhook:
+        if not admin:
+            return JSONResponse({"error": "webhook rules require X-Admin-Token"}, status_code=403)
+        try:
+            await check_webhook(req.webhook)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+    try:
+        rule, trigger = alert_engine.add(
+            req.coin.upper(), req.metric, req.op, req.threshold, req.window, req.once, req.webhook, req.note,
+            owner=None if admin else client_ip(request),
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    # A rule whose condition already holds fires right away
+    if trigger is not None:
+        publish_alerts(rule.coin, [trigger])
+    return {"rule": rule.to_dict(), "secret": rule.secret, "triggered": trigger}
+
+
+@router.get("/alerts", dependencies=[Depends(require_admin)])
+async def list_alerts(coin: Optional[str] = Query(default=None)):
+    return {"rules": alert_engine.rules(coin.upper() if coin else None), **alert_engine.report()}
+
+
+@router.delete("/alerts/{rule_id}")
+async def delete_alert(rule_id: int, x_alert_secret: str = Header(default=""), x_admin_token: str = Header(default="")):
+    rule = alert_engine.get(rule_id)
+    if rule is None:
+        return JSONResponse({"error": "unknown alert"}, status_code=404)
+    if not (hmac.compare_digest(x_alert_secret, rule.secret) or is_admin(x_admin_token)):
+        return JSONResponse({"error": "invalid alert secret"}, status_code=403)
+    if not alert_engine.remove(rule_id):
+        return JSONResponse({"error": "unknown alert"}, status_code=404)
+    return {"deleted": rule_id}
@@ -0,0 +1,59 @@
+"""
+All-coins overview: GET /snapshot and WebSocket /ws/overview.
+One pre-encoded document replaces a WS or several REST calls per coin.
+Included before the per-coin router so /ws/overview is not taken for a coin.
+"""
+import asyncio
+import logging
+
+from fastapi import APIRouter, Request, Response, WebSocket, WebSocketDisconnect
+
+from ..admission import Rejected, admission
+from ..overview import overview
+from ..streams import KEEPALIVE_SECONDS, PING_FRAME
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/snapshot")
+async def get_snapshot(request: Request):
+    """Latest overview document; 304 when If-None-Match matches its version."""
+    etag = overview.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(overview.body, media_type="application/json", headers=headers)
+
+
+@router.websocket("/ws/overview")
+async def overview_endpoint(websocket: WebSocket):
+    try:
+        ticket = admission.admit(websocket)
+    except Rejected as e:
+        await websocket.accept()
+        await websocket.close(code=e.code, reason=e.close_reason)
+        return
+    await websocket.accept()
+    q = overview.subscribe()
+    logger.info("WS overview client connected")
+    try:
+        await websocket.send_text(overview.frame)
+        while True:
+            try:
+                frame = await asyncio.wait_for(q.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                frame = PING_FRAME
+            if frame is None:
+                logger.info("WS overview client too slow, closing")
+                await websocket.close(code=1013)
+                break
+            await websocket.send_text(frame)
+            await ticket.pace()
+    except WebSocketDisconnect:
+        logger.info("WS overview client disconnected")
+    except Exception as e:
+        logger.warning("WS overview error: %s", e)
+    finally:
+        overview.unsubscribe(q)
+        ticket.release()
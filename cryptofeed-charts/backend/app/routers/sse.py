@@ -0,0 +1,67 @@
+"""
+Server-Sent Events endpoint: /stream/{coin}
+Same per-coin broadcast and pre-encoded frames as /ws/{coin}, for clients
+that cannot hold a WebSocket open (server-side routes, strict proxies).
+"""
+import logging
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..admission import Rejected, admission
+from ..store import COINS
+from ..streams import PING_FRAME, ClientStream
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # stop nginx-style proxies buffering the stream
+}
+
+
+@router.get("/stream/{coin}")
+async def sse_endpoint(request: Request, coin: str, indicators: str = "", channels: str = "", resume: str = "", epoch: str = ""):
+    coin = coin.upper()
+    if coin not in COINS:
+        return JSONResponse({"error": "unknown coin"}, status_code=400)
+    try:
+        stream = ClientStream(coin, indicators=indicators, channels=channels, resume=resume, epoch=epoch)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    try:
+        ticket = admission.admit(request)
+    except Rejected as e:
+        return JSONResponse({"error": e.reason, "retry_after": e.retry_after}, status_code=e.status,
+                            headers={"Retry-After": str(e.retry_after)})
+
+    async def events():
+        stream.open()
+        snapshot = stream.snapshot()
+        logger.info("SSE client connected: %s", coin)
+        try:
+            yield "retry: 3000\n\n"
+            for frame in snapshot:
+                yield f"data: {frame}\n\n"
+                await ticket.pace()
+            while not await request.is_disconnected():
+                frame = await stream.next_frame()
+                if frame is None:
+                    logger.info("SSE client too slow, closing: %s", coin)
+                    break
+                if frame is PING_FRAME:
+                    yield ": ping\n\n"
+                else:
+                    yield f"data: {frame}\n\n"
+                await ticket.pace()
+        finally:
+            stream.close()
+            ticket.release()
+            logger.info("SSE client disconnected: %s", coin)
+
+    # The background task covers a client gone before the generator started
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS,
+                             background=BackgroundTask(ticket.release))
@@ -3,36 +3,38 @@ WebSocket endpoint: /ws/{coin}
 Streams real-time cryptofeed data to connected clients.
 Also serves a REST endpoint for historical candle seed data.
 """
-import asyncio
-import json
 import logging
+import math
+import time
 from typing import Optional
 
-import httpx
-from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 
-from ..feed_manager import subscribe, unsubscribe
-from ..store import COINS, TIMEFRAME_SECONDS, store
+from .. import profiling
+from ..admission import Rejected, admission
+from ..footprint import FOOTPRINT_TIMEFRAMES, MAX_BARS as MAX_FOOTPRINT_BARS, footprints
+from ..heatmap import heatmaps
+from ..history import fetch_candles
+from ..indicators import build, indicator_hub, make_key, parse_key
+from ..store import COINS, TIMEFRAME_SECONDS, CandleBar, store
+from ..streams import ClientStream
+from ..trade_bars import MAX_BARS, parse_series, series_key, trade_bars
+from ..volume_profile import volume_profiles
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Binance REST base for historical candles
-BINANCE_REST = "https://api.binance.com/api/v3/klines"
 
-TIMEFRAME_BINANCE = {
-    "1m": "1m",
-    "5m": "5m",
-    "15m": "15m",
-    "1h": "1h",
-    "4h": "4h",
-    "1d": "1d",
-}
+def _retry_later(status: int, error: str, wait: float) -> JSONResponse:
+    retry_after = max(1, math.ceil(wait))
+    return JSONResponse({"error": error, "retry_after": retry_after}, status_code=status,
+                        headers={"Retry-After": str(retry_after)})
 
 
 @router.get("/candles/{coin}")
 async def get_candles(
+    request: Request,
     coin: str,
     tf: str = Query(default="1h"),
     limit: int = Query(default=200, le=500),
@@ -42,81 +44,179 @@ async def get_candles(
         return JSONResponse({"error": "unknown coin"}, status_code=400)
     if tf not in TIMEFRAME_SECONDS:
         return JSONResponse({"error": "unknown timeframe"}, status_code=400)
+    wait = admission.candles_wait(request)
+    if wait:
+        return _retry_later(429, "rate limited", wait)
 
     # Return from memory if we have enough candles
     cached = store[coin].get_candles(tf)
     if len(cached) >= limit:
         return JSONResponse(cached[-limit:])
 
-    # Fetch from Binance REST
-    symbol = f"{coin}USDT"
-    binance_tf = TIMEFRAME_BINANCE.get(tf, "1h")
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                BINANCE_REST,
-                params={"symbol": symbol, "interval": binance_tf, "limit": limit},
-            )
-            resp.raise_for_status()
-            raw = resp.json()
-    except Exception as e:
-        logger.error("Binance REST error for %s %s: %s", coin, tf, e)
+    # Binance fallback has its own instance-wide budget; serve what we hold
+    # when it is spent, or ask the client to come back
+    wait = admission.rest_fallback_wait()
+    if wait:
+        if cached:
+            return JSONResponse(cached)
+        return _retry_later(503, "history temporarily unavailable", wait)
+    candles = await fetch_candles(coin, tf, limit)
+    if candles is None:
         return JSONResponse(cached, status_code=200)
-
-    candles = [
-        {
-            "time": int(k[0]) // 1000,  # ms → s for lightweight-charts
-            "open": float(k[1]),
-            "high": float(k[2]),
-            "low": float(k[3]),
-            "close": float(k[4]),
-            "volume": float(k[5]),
-        }
-        for k in raw
-    ]
     return JSONResponse(candles)
 
 
+@router.get("/indicators/{coin}")
+async def get_indicator(
+    coin: str,
+    tf: str = Query(default="1m"),
+    kind: str = Query(default="ema"),
+    period: int = Query(default=20),
+    limit: int = Query(default=200, le=500),
+):
+    """History bootstrap for an indicator overlay; live updates arrive on
+    /ws/{coin}?indicators=<tf>:<kind>:<period>."""
+    coin = coin.upper()
+    if coin not in COINS:
+        return JSONResponse({"error": "unknown coin"}, status_code=400)
+    try:
+        tf, kind, period = parse_key(make_key(tf, kind, period))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    key = make_key(tf, kind, period)
+
+    # Shared live instance first, then the store, then Binance history
+    points = indicator_hub.points(coin, key)
+    if points is None:
+        bars = list(store[coin].candles[tf])
+        if len(bars) < limit + period:
+            fetched = await fetch_candles(coin, tf, min(limit + period, 1000))
+            if fetched:
+                bars = [CandleBar(**c) for c in fetched]
+        points = list(build(kind, period, bars).points)
+    return JSONResponse({"key": key, "points": points[-limit:]})
+
+
+@router.get("/profile/{coin}")
+async def get_profile(
+    coin: str,
+    start: Optional[int] = Query(default=None),
+    end: Optional[int] = Query(default=None),
+    tick: Optional[float] = Query(default=None, gt=0),
+):
+    """Volume at price over [start, end] (unix seconds, minute resolution;
+    defaults to everything kept, up to 24h). `tick` coarsens the buckets."""
+    coin = coin.upper()
+    if coin not in COINS:
+        return JSONResponse({"error": "unknown coin"}, status_code=400)
+    try:
+        profile = volume_profiles[coin].window(start, end, tick)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return JSONResponse({"coin": coin, **profile})
+
+
+@router.get("/bars/{coin}")
+async def get_bars(
+    coin: str,
+    series: str = Query(default=""),
+    limit: int = Query(default=200, ge=1, le=MAX_BARS),
+):
+    """Tick / volume / range bars (`series=tick:100`); without `series`, the
+    coin's available series. Live bars on /ws/{coin}?channels=bars:<series>."""
+    coin = coin.upper()
+    if coin not in COINS:
+        return JSONResponse({"error": "unknown coin"}, status_code=400)
+    builder = trade_bars[coin]
+    if not series:
+        return JSONResponse({"coin": coin, "series": list(builder.series)})
+    try:
+        key = series_key(*parse_series(series))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    if key not in builder.series:
+        return JSONResponse({"error": f"series not kept for {coin}", "series": list(builder.series)}, status_code=400)
+    return JSONResponse({"coin": coin, "series": key, "bars": builder.series[key].get(limit)})
+
+
+@router.get("/footprint/{coin}")
+async def get_footprint(
+    coin: str,
+    tf: str = Query(default="1m"),
+    limit: int = Query(default=100, ge=1, le=MAX_FOOTPRINT_BARS),
+):
+    """Footprint bars: [price, buy, sell] per level; live updates arrive on
+    /ws/{coin}?channels=footprint:<tf>."""
+    coin = coin.upper()
+    if coin not in COINS:
+        return JSONResponse({"error": "unknown coin"}, status_code=400)
+    if tf not in FOOTPRINT_TIMEFRAMES:
+        return JSONResponse({"error": "footprint not enabled for this timeframe"}, status_code=400)
+    return JSONResponse({"coin": coin, "tf": tf, "bars": footprints[coin].get(tf, limit)})
+
+
+@router.get("/heatmap/{coin}")
+async def get_heatmap(
+    coin: str,
+    start: Optional[int] = Query(default=None),
+    end: Optional[int] = Query(default=None),
+):
+    """Depth heatmap columns over [start, end] (unix seconds). Each column's
+    `sizes` is base64 of one byte per price bin: size ≈ byte / 255 × scale at
+    price (base + i) × bin."""
+    coin = coin.upper()
+    if coin not in COINS:
+        return JSONResponse({"error": "unknown coin"}, status_code=400)
+    return JSONResponse({"coin": coin, **heatmaps[coin].range(start, end)})
+
+
 @router.websocket("/ws/{coin}")
-async def websocket_endpoint(websocket: WebSocket, coin: str):
+async def websocket_endpoint(websocket: WebSocket, coin: str, indicators: str = "", channels: str = "", resume: str = "", epoch: str = ""):
     coin = coin.upper()
     if coin not in COINS:
         await websocket.close(code=4004)
         return
+    try:
+        stream = ClientStream(coin, indicators=indicators, channels=channels, resume=resume, epoch=epoch)
+    except ValueError:
+        await websocket.close(code=4400)
+        return
+    try:
+        ticket = admission.admit(websocket)
+    except Rejected as e:
+        # Accept first so the close code and retry hint reach the client
+        await websocket.accept()
+        await websocket.close(code=e.code, reason=e.close_reason)
+        return
 
     await websocket.accept()
     logger.info("WS client connected: %s", coin)
-
-    q: asyncio.Queue = asyncio.Queue(maxsize=200)
-    subscribe(coin, q)
+    stream.open()
 
     # Send current snapshot immediately on connect
-    snap = store[coin]
     try:
-        await websocket.send_text(json.dumps({"type": "book", "data": snap.book.to_dict()}))
-        await websocket.send_text(json.dumps({"type": "funding", "data": snap.funding.to_dict()}))
-        await websocket.send_text(json.dumps({"type": "oi", "data": snap.open_interest.to_dict()}))
-        recent_trades = [t.to_dict() for t in list(snap.trades)[-20:]]
-        for trade in recent_trades:
-            await websocket.send_text(json.dumps({"type": "trade", "data": trade}))
-        recent_liqs = [l.to_dict() for l in list(snap.liquidations)[-10:]]
-        for liq in recent_liqs:
-            await websocket.send_text(json.dumps({"type": "liquidation", "data": liq}))
+        for frame in stream.snapshot():
+            await websocket.send_text(frame)
+            await ticket.pace()
     except Exception:
         pass
 
     try:
         while True:
-            # Wait for new data or client ping
-            try:
-                msg = await asyncio.wait_for(q.get(), timeout=20.0)
-                await websocket.send_text(json.dumps(msg))
-            except asyncio.TimeoutError:
-                # Send keepalive ping
-                await websocket.send_text(json.dumps({"type": "ping"}))
+            # Wait for new data; a ping goes out after a quiet period
+            frame = await stream.next_frame()
+            if frame is None:
+                logger.info("WS client too slow, closing: %s", coin)
+                await websocket.close(code=1013)
+                break
+            start = time.perf_counter()
+            await websocket.send_text(frame)
+            profiling.record("ws_send", time.perf_counter() - start)
+            await ticket.pace()
     except WebSocketDisconnect:
         logger.info("WS client disconnected: %s", coin)
     except Exception as e:
         logger.warning("WS error for %s: %s", coin, e)
     finally:
-        unsubscribe(coin, q)
+        stream.close()
+        ticket.release()
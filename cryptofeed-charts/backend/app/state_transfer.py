@@ -0,0 +1,223 @@
+"""
+Peer state transfer for rolling deploys.
+A warm instance streams its CoinStore buffers (candles for every timeframe,
+trades, tape prints, liquidations, latest book / funding / OI / perp values)
+as a zlib-compressed binary dump on /admin/state. With BOOTSTRAP_PEER set, a
+new instance pulls that dump before reporting ready and only falls back to
+Binance REST for coins the peer could not provide.
+
+Dump layout (little-endian, inside the zlib stream):
+    header   MAGIC, version u8, exported_at i64 (ms)
+    section  kind u8, coin (u8 length + ascii), key (u8 length + ascii),
+             count u32, count fixed-size records
+    end      kind 0
+"""
+import asyncio
+import logging
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+import httpx
+
+from .feed_manager import run_on_feed_loop
+from .store import COINS, CandleBar, LiquidationEvent, Trade, store
+from .tape import AggTrade
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_PEER = os.environ.get("BOOTSTRAP_PEER", "").rstrip("/")
+BOOTSTRAP_TIMEOUT = float(os.environ.get("BOOTSTRAP_TIMEOUT", "20"))
+PEER_TOKEN = os.environ.get("ADMIN_TOKEN", "")  # peers share the admin token
+
+MAGIC = b"CFST"
+VERSION = 1
+
+END, CANDLES, TRADES, AGG_TRADES, LIQUIDATIONS, LATEST = range(6)
+
+HEADER = struct.Struct("<4sBq")
+COUNT = struct.Struct("<I")
+RECORDS = {
+    CANDLES: struct.Struct("<q5d"),         # time, open, high, low, close, volume
+    TRADES: struct.Struct("<ddBq"),         # price, size, side, time
+    AGG_TRADES: struct.Struct("<ddBqqI"),   # price, size, side, time, last_time, count
+    LIQUIDATIONS: struct.Struct("<Bddq"),   # side, size, price, time
+    # book bid/ask, funding rate/next time, OI/timestamp, perp bid/ask/mark/index
+    LATEST: struct.Struct("<dddqdqdddd"),
+}
+
+SIDES = ("buy", "sell")
+_SIDE_CODES = {side: i for i, side in enumerate(SIDES)}
+
+
+def _side(side: str) -> int:
+    try:
+        return _SIDE_CODES[side]
+    except KeyError:
+        raise ValueError(f"unknown side {side!r}") from None
+
+
+def _section(kind: int, coin: str, key: str, rows: List[tuple]) -> bytes:
+    record = RECORDS[kind]
+    head = bytes([kind, len(coin)]) + coin.encode() + bytes([len(key)]) + key.encode() + COUNT.pack(len(rows))
+    return head + b"".join(record.pack(*row) for row in rows)
+
+
+# ── Export ───────────────────────────────────────────────────
+
+
+def _coin_sections(coin: str) -> Iterator[bytes]:
+    cs = store[coin]
+    for tf, q in list(cs.candles.items()):
+        bars = list(q)
+        if bars:
+            yield _section(CANDLES, coin, tf, [(b.time, b.open, b.high, b.low, b.close, b.volume) for b in bars])
+    yield _section(TRADES, coin, "", [(t.price, t.size, _side(t.side), t.time) for t in list(cs.trades)])
+    yield _section(AGG_TRADES, coin, "", [
+        (a.price, a.size, _side(a.side), a.time, a.last_time, a.count) for a in list(cs.agg_trades)
+    ])
+    yield _section(LIQUIDATIONS, coin, "", [(_side(l.side), l.size, l.price, l.time) for l in list(cs.liquidations)])
+    book, funding, oi, perp = cs.book, cs.funding, cs.open_interest, cs.perp
+    yield _section(LATEST, coin, "", [(
+        book.bid, book.ask, funding.rate, funding.next_funding_time, oi.open_interest, oi.timestamp,
+        perp.bid, perp.ask, perp.mark_price, perp.index_price,
+    )])
+
+
+def export_state() -> Iterator[bytes]:
+    """The compressed dump, one chunk per coin. Each coin is copied as it is
+    reached, so a slow reader never holds more than one coin in memory."""
+    compressor = zlib.compressobj(6)
+    yield compressor.compress(HEADER.pack(MAGIC, VERSION, int(time.time() * 1000)))
+    for coin in COINS:
+        chunk = b"".join(compressor.compress(section) for section in _coin_sections(coin))
+        yield chunk + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.compress(bytes([END])) + compressor.flush()
+
+
+# ── Import ───────────────────────────────────────────────────
+
+
+def _merge(q: deque, older: list, time_of: Callable) -> deque:
+    """Put peer entries older than anything already received live in front."""
+    live = list(q)
+    first_live = time_of(live[0]) if live else None
+    keep = [item for item in older if first_live is None or time_of(item) < first_live]
+    return deque(keep + live, maxlen=q.maxlen)
+
+
+def _apply_latest(coin: str, row: tuple):
+    """Peer values fill only what the live feed has not set yet. Book and perp
+    values are flagged as restored so readiness keeps waiting for live ones."""
+    cs = store[coin]
+    bid, ask, rate, next_time, oi, oi_time, perp_bid, perp_ask, mark, index = row
+    if not cs.book.bid:
+        cs.book.bid, cs.book.ask = bid, ask
+        cs.book.restored = True
+    if not cs.funding.next_funding_time:
+        cs.funding.rate, cs.funding.next_funding_time = rate, next_time
+    if not cs.open_interest.timestamp:
+        cs.open_interest.open_interest, cs.open_interest.timestamp = oi, oi_time
+    if not cs.perp.mark_price:
+        cs.perp.bid, cs.perp.ask, cs.perp.mark_price, cs.perp.index_price = perp_bid, perp_ask, mark, index
+        cs.perp.restored = True
+
+
+Section = Tuple[int, str, str, list]  # kind, coin, key, decoded entries
+
+
+def parse_state(data: bytes) -> List[Section]:
+    """Decode a decompressed dump into store objects without touching the
+    store. Raises ValueError on a malformed or incompatible dump."""
+    magic, version, exported_at = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} state dump")
+    offset = HEADER.size
+    sections: List[Section] = []
+    try:
+        while True:
+            kind = data[offset]
+            offset += 1
+            if kind == END:
+                break
+            n = data[offset]
+            coin = data[offset + 1:offset + 1 + n].decode()
+            offset += 1 + n
+            n = data[offset]
+            key = data[offset + 1:offset + 1 + n].decode()
+            offset += 1 + n
+            (count,) = COUNT.unpack_from(data, offset)
+            offset += COUNT.size
+            record = RECORDS[kind]
+            rows = [record.unpack_from(data, offset + i * record.size) for i in range(count)]
+            offset += count * record.size
+            if coin not in store:
+                continue  # peer tracks a coin we do not
+            if kind == CANDLES:
+                entries = [CandleBar(*row) for row in rows]
+            elif kind == TRADES:
+                entries = [Trade(price, size, SIDES[side], t) for price, size, side, t in rows]
+            elif kind == AGG_TRADES:
+                entries = []
+                for price, size, side, t, last_time, n_trades in rows:
+                    agg = AggTrade(price, size, SIDES[side], t)
+                    agg.last_time, agg.count = last_time, n_trades
+                    entries.append(agg)
+            elif kind == LIQUIDATIONS:
+                entries = [LiquidationEvent(SIDES[side], size, price, t) for side, size, price, t in rows]
+            else:
+                entries = rows
+            sections.append((kind, coin, key, entries))
+    except (IndexError, KeyError, struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"truncated or corrupt state dump at byte {offset}") from e
+    logger.info("Parsed peer state exported %.1fs ago", time.time() - exported_at / 1000)
+    return sections
+
+
+def apply_state(sections: List[Section]) -> Dict[str, Set[str]]:
+    """Merge parsed sections into the store. Returns coin -> timeframes
+    restored. Swaps store deques, so it must run on the feed loop."""
+    restored: Dict[str, Set[str]] = {}
+    for kind, coin, key, entries in sections:
+        cs = store[coin]
+        if kind == CANDLES:
+            if key in cs.candles:
+                cs.seed_candles(key, entries)
+                restored.setdefault(coin, set()).add(key)
+        elif kind == TRADES:
+            cs.trades = _merge(cs.trades, entries, lambda t: t.time)
+        elif kind == AGG_TRADES:
+            cs.agg_trades = _merge(cs.agg_trades, entries, lambda a: a.time)
+        elif kind == LIQUIDATIONS:
+            cs.liquidations = _merge(cs.liquidations, entries, lambda l: l.time)
+        elif kind == LATEST and entries:
+            _apply_latest(coin, entries[0])
+    return restored
+
+
+async def _pull(url: str) -> bytes:
+    decompressor = zlib.decompressobj()
+    parts = []
+    async with httpx.AsyncClient(timeout=BOOTSTRAP_TIMEOUT) as client:
+        async with client.stream("GET", url, headers={"X-Admin-Token": PEER_TOKEN}) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.aiter_raw():
+                parts.append(decompressor.decompress(chunk))
+    parts.append(decompressor.flush())
+    return b"".join(parts)
+
+
+async def bootstrap_from_peer(peer: str = BOOTSTRAP_PEER) -> Dict[str, Set[str]]:
+    """Pull and import a peer's state; empty on any failure (the caller
+    falls back to REST seeding)."""
+    try:
+        data = await asyncio.wait_for(_pull(f"{peer}/admin/state"), BOOTSTRAP_TIMEOUT)
+        restored = await run_on_feed_loop(apply_state, parse_state(data))
+    except Exception as e:
+        logger.warning("State bootstrap from %s failed: %s", peer, e)
+        return {}
+    logger.info("Bootstrapped %d coins from %s", len(restored), peer)
+    return restored
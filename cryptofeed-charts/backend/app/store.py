@@ -2,12 +2,15 @@
 In-memory rolling data store for all coins and feeds.
 """
 from collections import deque
-from typing import Deque, Dict, Optional
+from typing import Deque, Dict, List, Optional
 import time
 
 COINS = ["BTC", "ETH", "SOL", "XRP"]
 
 TIMEFRAME_SECONDS = {
+    "1s": 1,  # 1s / 5s / 15s are built from trades (trade_candles.py)
+    "5s": 5,
+    "15s": 15,
     "1m": 60,
     "5m": 300,
     "15m": 900,
@@ -18,6 +21,10 @@ TIMEFRAME_SECONDS = {
 
 MAX_CANDLES = 500
 MAX_TRADES = 100
+MAX_LIQUIDATIONS = 50
+
+# Binance perps settle funding every 8h
+FUNDINGS_PER_YEAR = 3 * 365
 
 
 class CandleBar:
@@ -59,6 +66,7 @@ class BookSnapshot:
     def __init__(self):
         self.bid: float = 0.0
         self.ask: float = 0.0
+        self.restored = False  # values came from a peer dump, not the live feed
 
     @property
     def spread(self) -> float:
@@ -88,6 +96,67 @@ class OpenInterestData:
         return {"open_interest": self.open_interest, "timestamp": self.timestamp}
 
 
+class PerpData:
+    """Perp top of book (bookTicker) plus mark / index from the markPrice stream."""
+
+    def __init__(self):
+        self.bid: float = 0.0
+        self.ask: float = 0.0
+        self.mark_price: float = 0.0
+        self.index_price: float = 0.0
+        self.restored = False  # values came from a peer dump, not the live feed
+
+    def to_dict(self) -> dict:
+        return {"bid": self.bid, "ask": self.ask, "mark_price": self.mark_price, "index_price": self.index_price}
+
+
+class BasisData:
+    """Spot-perp basis and annualized carry, recomputed from the latest inputs."""
+
+    def __init__(self):
+        self.spot_mid: float = 0.0
+        self.perp_mid: float = 0.0
+        self.mark_price: float = 0.0
+        self.index_price: float = 0.0
+        self.basis: float = 0.0
+        self.basis_bps: float = 0.0
+        self.premium_bps: float = 0.0
+        self.carry_apr: float = 0.0
+        self.time: int = 0
+
+    def update(self, book: BookSnapshot, perp: PerpData, funding: FundingData, time: int) -> bool:
+        """Returns False until both spot and perp prices are known."""
+        if not (book.bid and book.ask) or not (perp.mark_price or (perp.bid and perp.ask)):
+            return False
+        self.spot_mid = (book.bid + book.ask) / 2
+        self.perp_mid = (perp.bid + perp.ask) / 2 if perp.bid and perp.ask else perp.mark_price
+        self.mark_price = perp.mark_price
+        self.index_price = perp.index_price
+        self.basis = self.perp_mid - self.spot_mid
+        self.basis_bps = round(self.basis / self.spot_mid * 10_000, 3)
+        self.premium_bps = (
+            round((perp.mark_price - perp.index_price) / perp.index_price * 10_000, 3)
+            if perp.mark_price and perp.index_price
+            else 0.0
+        )
+        self.carry_apr = round(funding.rate * FUNDINGS_PER_YEAR * 100, 3)
+        self.time = time
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "spot_mid": self.spot_mid,
+            "perp_mid": self.perp_mid,
+            "mark_price": self.mark_price,
+            "index_price": self.index_price,
+            "basis": self.basis,
+            "basis_bps": self.basis_bps,
+            "premium_bps": self.premium_bps,
+            "carry_apr": self.carry_apr,
+            "time": self.time,
+        }
+
+
 class LiquidationEvent:
     __slots__ = ("side", "size", "price", "time")
 
@@ -108,21 +177,54 @@ class CoinStore:
             tf: deque(maxlen=MAX_CANDLES) for tf in TIMEFRAME_SECONDS
         }
         self.trades: Deque[Trade] = deque(maxlen=MAX_TRADES)
+        self.agg_trades: Deque = deque(maxlen=MAX_TRADES)  # tape.AggTrade prints
         self.book = BookSnapshot()
         self.funding = FundingData()
         self.open_interest = OpenInterestData()
-        self.liquidations: Deque[LiquidationEvent] = deque(maxlen=50)
-
-    def update_candle(self, tf: str, bar: CandleBar):
+        self.perp = PerpData()
+        self.basis = BasisData()
+        self.liquidations: Deque[LiquidationEvent] = deque(maxlen=MAX_LIQUIDATIONS)
+
+    def update_candle(self, tf: str, bar: CandleBar) -> Optional[bool]:
+        """True when `bar` is the newest bar in the ring. A late bar replaces
+        the stored bar with the same time (False) or is dropped if there is
+        none (None). Bars are never appended out of order."""
         q = self.candles[tf]
-        if q and q[-1].time == bar.time:
-            q[-1] = bar  # update in-progress bar
-        else:
+        if not q or bar.time > q[-1].time:
             q.append(bar)
+            return True
+        if q[-1].time == bar.time:
+            q[-1] = bar  # update in-progress bar
+            return True
+        # e.g. the closed kline for T-60 after a trade opened bar T (LOCAL_1M)
+        for i in range(len(q) - 2, -1, -1):
+            if q[i].time == bar.time:
+                q[i] = bar
+                return False
+            if q[i].time < bar.time:
+                break
+        return None
 
     def get_candles(self, tf: str) -> list:
         return [c.to_dict() for c in self.candles[tf]]
 
+    def seed_candles(self, tf: str, bars: List[CandleBar]):
+        """Prepend historical bars older than anything received live."""
+        q = self.candles[tf]
+        live = list(q)
+        first_live = live[0].time if live else None
+        older = [b for b in bars if first_live is None or b.time < first_live]
+        self.candles[tf] = deque(older + live, maxlen=q.maxlen)
+
+    def resize(self, max_candles: int, max_trades: int):
+        """Change rolling capacities, keeping the most recent entries."""
+        for tf, q in list(self.candles.items()):
+            if q.maxlen != max_candles:
+                self.candles[tf] = deque(list(q)[-max_candles:], maxlen=max_candles)
+        if self.trades.maxlen != max_trades:
+            self.trades = deque(list(self.trades)[-max_trades:], maxlen=max_trades)
+            self.agg_trades = deque(list(self.agg_trades)[-max_trades:], maxlen=max_trades)
+
 
 # Global store — one CoinStore per coin
 store: Dict[str, CoinStore] = {coin: CoinStore() for coin in COINS}
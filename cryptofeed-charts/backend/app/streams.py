@@ -0,0 +1,173 @@
+"""
+Per-client stream state shared by the WebSocket and SSE transports.
+Both attach to the same per-coin broadcast and receive the same pre-encoded
+JSON frames; only the framing on the wire differs.
+"""
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+from .feed_manager import EPOCH, current_seq, replay_since, subscribe, unsubscribe
+from .footprint import FOOTPRINT_TIMEFRAMES, footprints
+from .indicators import indicator_hub, make_key, parse_key
+from .memory import ResizableQueue, governor
+from .store import store
+from .trade_bars import trade_bars
+from .trade_candles import SUBMINUTE_TIMEFRAMES
+
+KEEPALIVE_SECONDS = 20.0
+PING_FRAME = json.dumps({"type": "ping"})
+
+# Channels a client can opt into with ?channels=
+# agg_trade: merged same-side/same-price prints instead of raw trades
+# candle_delta: changed fields of the in-progress bar, full bars on open/keyframe
+# basis: spot-perp basis, mark / index premium and annualized carry (throttled)
+# alert: triggers of the coin's alert rules (see /alerts)
+# candle:<tf>: trade-built 1s / 5s / 15s bars
+# bars:<kind>:<size>: tick / volume / range bars (per-coin series, see /bars)
+# footprint:<tf>: per-price buy/sell volume bars for a FOOTPRINT_TIMEFRAMES entry
+# (candle_fix, always sent: a past 1m bar replaced by the closed kline)
+OPTIONAL_CHANNELS = (
+    {"agg_trade", "alert", "basis", "candle_delta"}
+    | {f"candle:{tf}" for tf in SUBMINUTE_TIMEFRAMES}
+    | {f"footprint:{tf}" for tf in FOOTPRINT_TIMEFRAMES}
+)
+
+
+def _frame(msg_type: str, data: dict) -> str:
+    return json.dumps({"type": msg_type, "data": data})
+
+
+class ClientStream:
+    """One client's subscription to a coin. Raises ValueError on bad params."""
+
+    def __init__(self, coin: str, indicators: str = "", channels: str = "", resume: str = "", epoch: str = ""):
+        self.coin = coin
+        # ?indicators=1m:ema:20,1m:rsi:14 — opt-in shared overlays
+        self.indicator_keys = sorted({make_key(*parse_key(spec, live=True)) for spec in indicators.split(",") if spec})
+        # ?channels=agg_trade,candle_delta — opt-in alternative channels
+        self.channels = {name for name in channels.split(",") if name}
+        unknown = {
+            ch for ch in self.channels - OPTIONAL_CHANNELS
+            if not (ch.startswith("bars:") and ch[5:] in trade_bars[coin].series)
+        }
+        if unknown:
+            raise ValueError(f"unknown channels: {', '.join(sorted(unknown))}")
+        # ?resume=trade:1234,book:88&epoch=<hello.epoch> — last seq seen per channel.
+        # Seqs from another server epoch are meaningless, so they are ignored.
+        self.resume: Dict[str, int] = {}
+        for item in resume.split(","):
+            if item:
+                channel, _, seq = item.rpartition(":")
+                self.resume[channel] = int(seq)
+        if epoch != EPOCH:
+            self.resume = {}
+        self.queue: asyncio.Queue = ResizableQueue(maxsize=governor.queue_size)
+
+    @property
+    def topics(self) -> List[str]:
+        return [f"indicator:{key}" for key in self.indicator_keys] + sorted(self.channels)
+
+    def open(self):
+        for key in self.indicator_keys:
+            indicator_hub.acquire(self.coin, key)
+        subscribe(self.coin, self.queue, topics=self.topics)
+
+    def close(self):
+        unsubscribe(self.coin, self.queue)
+        for key in self.indicator_keys:
+            indicator_hub.release(self.coin, key)
+
+    @property
+    def stream_channels(self) -> List[str]:
+        """Sequenced channels this client receives, in snapshot order."""
+        return [
+            "book",
+            "funding",
+            "oi",
+            "candle_delta" if "candle_delta" in self.channels else "candle",
+            "candle_fix",
+            "agg_trade" if "agg_trade" in self.channels else "trade",
+            "liquidation",
+        ] + [ch for ch in ("basis", "alert") if ch in self.channels] + sorted(
+            ch for ch in self.channels if ch.startswith(("candle:", "footprint:", "bars:"))
+        ) + [f"indicator:{key}" for key in self.indicator_keys]
+
+    def snapshot(self) -> List[str]:
+        """Frames sent immediately on connect: a hello with the server epoch and
+        current seq per channel, then, per channel, either the frames missed
+        since the client's resume point or a fresh snapshot.
+
+        Must run synchronously right after open(): fan-out happens on the same
+        loop, so nothing can land between the replay and the live queue."""
+        channels = self.stream_channels
+        hello = {"type": "hello", "epoch": EPOCH, "seqs": {ch: current_seq(self.coin, ch) for ch in channels}}
+        frames = [json.dumps(hello)]
+        for channel in channels:
+            if channel in self.resume:
+                missed = replay_since(self.coin, channel, self.resume[channel])
+                if missed is not None:
+                    frames.extend(missed)
+                    continue
+                frames.extend(self._channel_snapshot(channel, resync=True))
+            else:
+                frames.extend(self._channel_snapshot(channel, resync=False))
+        return frames
+
+    def _channel_snapshot(self, channel: str, resync: bool) -> List[str]:
+        snap = store[self.coin]
+        if channel == "book":
+            return [_frame("book", snap.book.to_dict())]
+        if channel == "funding":
+            return [_frame("funding", snap.funding.to_dict())]
+        if channel == "oi":
+            return [_frame("oi", snap.open_interest.to_dict())]
+        if channel in ("candle", "candle_delta"):
+            if resync:
+                # Too far behind to replay: resend the series instead of
+                # sending the client back to /candles
+                return [_frame("candles", snap.get_candles("1m"))]
+            if channel == "candle_delta" and snap.candles["1m"]:
+                # Patches apply to the last full bar, so start from one
+                return [_frame("candle", snap.candles["1m"][-1].to_dict())]
+            return []
+        if channel == "candle_fix":
+            # Fixes missed beyond the replay buffer: the series has them
+            return [_frame("candles", snap.get_candles("1m"))] if resync else []
+        if channel == "agg_trade":
+            return [_frame("agg_trade", a.to_dict()) for a in list(snap.agg_trades)[-20:]]
+        if channel == "trade":
+            return [_frame("trade", t.to_dict()) for t in list(snap.trades)[-20:]]
+        if channel == "basis":
+            return [_frame("basis", snap.basis.to_dict())] if snap.basis.time else []
+        if channel.startswith("candle:"):
+            tf = channel.split(":", 1)[1]
+            if resync:
+                return [json.dumps({"type": "candles", "tf": tf, "data": snap.get_candles(tf)})]
+            return []
+        if channel.startswith("bars:"):
+            key = channel[5:]
+            if resync:
+                return [json.dumps({"type": "bars", "series": key, "data": trade_bars[self.coin].series[key].get(200)})]
+            return []
+        if channel.startswith("footprint:"):
+            tf = channel.split(":", 1)[1]
+            if resync:
+                return [_frame("footprints", {"tf": tf, "bars": footprints[self.coin].get(tf, 50)})]
+            # Deltas apply to the open bar, so start from it
+            return [_frame("footprint", bar) for bar in footprints[self.coin].get(tf, 1)]
+        if channel == "liquidation":
+            return [_frame("liquidation", l.to_dict()) for l in list(snap.liquidations)[-10:]]
+        if channel.startswith("indicator:") and resync:
+            key = channel.split(":", 1)[1]
+            points = indicator_hub.points(self.coin, key) or []
+            return [_frame("indicator_points", {"key": key, "points": points})]
+        return []
+
+    async def next_frame(self) -> Optional[str]:
+        """Next broadcast frame, PING_FRAME after a quiet period, or None once
+        the client has been evicted for falling behind."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            return PING_FRAME
@@ -0,0 +1,63 @@
+"""
+Trade tape aggregation.
+Merges consecutive same-side, same-price fills that land inside a short
+window into one print, so sweeps go out as one message instead of dozens.
+"""
+from typing import Optional
+
+from .store import Trade
+
+AGG_WINDOW_MS = 100
+
+
+class AggTrade:
+    __slots__ = ("price", "size", "side", "time", "last_time", "count")
+
+    def __init__(self, price: float, size: float, side: str, time: int):
+        self.price = price
+        self.size = size
+        self.side = side
+        self.time = time
+        self.last_time = time
+        self.count = 1
+
+    def to_dict(self) -> dict:
+        return {
+            "price": self.price,
+            "size": self.size,
+            "side": self.side,
+            "time": self.time,
+            "last_time": self.last_time,
+            "count": self.count,
+        }
+
+
+class TapeAggregator:
+    """Holds at most one open print; add() returns the print it closes."""
+
+    def __init__(self, window_ms: int = AGG_WINDOW_MS):
+        self.window_ms = window_ms
+        self.pending: Optional[AggTrade] = None
+
+    def add(self, trade: Trade) -> Optional[AggTrade]:
+        pending = self.pending
+        if (
+            pending is not None
+            and pending.side == trade.side
+            and pending.price == trade.price
+            and trade.time - pending.time <= self.window_ms
+        ):
+            pending.size += trade.size
+            pending.last_time = trade.time
+            pending.count += 1
+            return None
+        self.pending = AggTrade(trade.price, trade.size, trade.side, trade.time)
+        return pending
+
+    def flush(self, expected: Optional[AggTrade] = None) -> Optional[AggTrade]:
+        """Close the open print. With `expected`, only if it is still that print."""
+        pending = self.pending
+        if pending is None or (expected is not None and pending is not expected):
+            return None
+        self.pending = None
+        return pending
@@ -0,0 +1,164 @@
+"""
+Non-time bars built from the trade stream: N-tick, fixed-volume and
+fixed-range. Each coin keeps the series listed in BAR_SERIES_<COIN> (or
+DEFAULT_SERIES), shared by every client, in MAX_BARS rings. Like the
+trade-built candles, updates are coalesced per series over FLUSH_INTERVAL.
+"""
+import os
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from .store import COINS, Trade
+
+MAX_BARS = 500
+FLUSH_INTERVAL = 0.25
+KINDS = ("tick", "volume", "range")
+
+DEFAULT_SERIES = {
+    "BTC": "tick:100,tick:500,volume:10,range:50",
+    "ETH": "tick:100,tick:500,volume:100,range:5",
+    "SOL": "tick:100,tick:500,volume:1000,range:0.5",
+    "XRP": "tick:100,tick:500,volume:100000,range:0.005",
+}
+
+
+def parse_series(spec: str) -> Tuple[str, float]:
+    """'volume:10' → ('volume', 10.0). Raises ValueError on bad input."""
+    kind, size = spec.split(":")
+    if kind not in KINDS:
+        raise ValueError(f"unknown bar kind {kind!r}")
+    value = float(size)
+    if value <= 0 or (kind == "tick" and value != int(value)):
+        raise ValueError(f"bad size for {kind} bars: {size!r}")
+    return kind, value
+
+
+def series_key(kind: str, size: float) -> str:
+    return f"{kind}:{int(size) if size == int(size) else size}"
+
+
+class TradeBar:
+    __slots__ = ("time", "end", "open", "high", "low", "close", "volume", "count")
+
+    def __init__(self, trade: Trade, size: float):
+        self.time = trade.time  # ms of the first trade; bars can share a second
+        self.end = trade.time
+        self.open = self.high = self.low = self.close = trade.price
+        self.volume = size
+        self.count = 1
+
+    def add(self, trade: Trade, size: float):
+        price = trade.price
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.end = trade.time
+        self.volume += size
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "time": self.time,
+            "end": self.end,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+            "count": self.count,
+        }
+
+
+class BarSeries:
+    """One tick / volume / range series. Runs on the feed thread only."""
+
+    def __init__(self, kind: str, size: float):
+        self.kind = kind
+        self.size = size
+        self.key = series_key(kind, size)
+        self._full = size * (1 - 1e-9)  # volume bars: float slack when splitting
+        self.bars: Deque[TradeBar] = deque(maxlen=MAX_BARS)
+        self._unsent: List[TradeBar] = []  # closed since the last flush
+
+    @property
+    def current(self) -> Optional[TradeBar]:
+        return self.bars[-1] if self.bars else None
+
+    def _open(self, trade: Trade, size: float):
+        if self.bars:
+            self._unsent.append(self.bars[-1])
+        self.bars.append(TradeBar(trade, size))
+
+    def add(self, trade: Trade):
+        bar = self.current
+        if self.kind == "tick":
+            if bar is None or bar.count >= self.size:
+                self._open(trade, trade.size)
+            else:
+                bar.add(trade, trade.size)
+        elif self.kind == "volume":
+            # Split fills across bars so every closed bar holds exactly `size`
+            remaining = trade.size
+            while remaining > 0:
+                bar = self.current
+                if bar is None or bar.volume >= self._full:
+                    part = min(remaining, self.size)
+                    self._open(trade, part)
+                else:
+                    part = min(remaining, self.size - bar.volume)
+                    bar.add(trade, part)
+                remaining -= part
+                if remaining < self.size - self._full:
+                    break
+        else:
+            if bar is None or max(bar.high, trade.price) - min(bar.low, trade.price) > self.size:
+                self._open(trade, trade.size)
+            else:
+                bar.add(trade, trade.size)
+
+    def flush(self) -> List[dict]:
+        """Closed bars since the last flush (final state), then the open bar."""
+        bars = [bar.to_dict() for bar in self._unsent]
+        self._unsent = []
+        if self.bars:
+            bars.append(self.bars[-1].to_dict())
+        return bars
+
+    def get(self, limit: int) -> List[dict]:
+        return [bar.to_dict() for bar in list(self.bars)[-limit:]]
+
+
+class TradeBarBuilder:
+    """All of one coin's non-time series."""
+
+    def __init__(self, specs: str):
+        self.series: Dict[str, BarSeries] = {}
+        for spec in specs.split(","):
+            if spec:
+                s = BarSeries(*parse_series(spec))
+                self.series[s.key] = s
+        self._pending: Set[str] = set()
+
+    def add(self, trade: Trade) -> List[str]:
+        """Returns series keys that need a flush scheduled."""
+        dirty = []
+        for key, series in self.series.items():
+            series.add(trade)
+            if key not in self._pending:
+                self._pending.add(key)
+                dirty.append(key)
+        return dirty
+
+    def flush(self, key: str) -> List[dict]:
+        self._pending.discard(key)
+        return self.series[key].flush()
+
+
+def _specs(coin: str) -> str:
+    return os.environ.get(f"BAR_SERIES_{coin}", DEFAULT_SERIES.get(coin, "tick:100"))
+
+
+# Global builders — one per coin, fed from the trade stream
+trade_bars: Dict[str, TradeBarBuilder] = {coin: TradeBarBuilder(_specs(coin)) for coin in COINS}
@@ -0,0 +1,81 @@
+"""
+Candles built from the trade stream: 1s / 5s / 15s, which Binance klines do
+not provide, and optionally (LOCAL_1M=1) the in-progress 1m bar, which
+otherwise only moves when a kline push arrives. Bars live in the same
+CoinStore.candles rings as kline-fed timeframes. Updates are coalesced per
+(coin, tf) over FLUSH_INTERVAL; bars that close in between go out once in
+their final state.
+"""
+import os
+from typing import Dict, List, Set
+
+from .store import COINS, TIMEFRAME_SECONDS, CandleBar, Trade
+
+SUBMINUTE_TIMEFRAMES = ["1s", "5s", "15s"]
+LOCAL_1M = os.environ.get("LOCAL_1M", "") == "1"
+TRADE_TIMEFRAMES = SUBMINUTE_TIMEFRAMES + (["1m"] if LOCAL_1M else [])
+FLUSH_INTERVAL = 0.25
+
+
+class TradeCandleBuilder:
+    """One coin's trade-built bars. Runs on the feed thread only."""
+
+    def __init__(self, timeframes: List[str] = TRADE_TIMEFRAMES):
+        self.timeframes = [(tf, TIMEFRAME_SECONDS[tf]) for tf in timeframes]
+        self.current: Dict[str, CandleBar] = {}
+        self._closed: Dict[str, List[CandleBar]] = {tf: [] for tf in timeframes}
+        self._pending: Set[str] = set()
+        # Bar time per tf already replaced by an authoritative kline
+        self._sealed: Dict[str, int] = {}
+
+    def add(self, trade: Trade) -> List[tuple]:
+        """Fold a trade into every timeframe. Returns (tf, bar, opened, schedule)
+        per timeframe touched: `opened` when the trade started a new bar (the
+        caller stores it), `schedule` when a flush needs scheduling."""
+        seconds = trade.time // 1000
+        price, size = trade.price, trade.size
+        touched = []
+        for tf, length in self.timeframes:
+            start = seconds - seconds % length
+            if start <= self._sealed.get(tf, -1):
+                continue
+            bar = self.current.get(tf)
+            opened = bar is None or bar.time < start
+            if opened:
+                if bar is not None and tf in self._pending:
+                    self._closed[tf].append(bar)
+                bar = self.current[tf] = CandleBar(start, price, price, price, price, size)
+            elif bar.time > start:
+                continue  # late trade for a bar that already closed
+            else:
+                if price > bar.high:
+                    bar.high = price
+                elif price < bar.low:
+                    bar.low = price
+                bar.close = price
+                bar.volume += size
+            schedule = tf not in self._pending
+            self._pending.add(tf)
+            touched.append((tf, bar, opened, schedule))
+        return touched
+
+    def flush(self, tf: str) -> List[CandleBar]:
+        """Bars to emit for `tf`: closed ones in their final state, then the
+        open bar."""
+        self._pending.discard(tf)
+        bars, self._closed[tf] = self._closed[tf], []
+        bar = self.current.get(tf)
+        if bar is not None:
+            bars.append(bar)
+        return bars
+
+    def seal(self, tf: str, bar: CandleBar):
+        """An exchange bar replaced ours (closed 1m kline); later trades for
+        that bar are already counted in it."""
+        self._sealed[tf] = bar.time
+        if tf in self.current and self.current[tf].time == bar.time:
+            self.current[tf] = bar
+
+
+# Global builders — one per coin, fed from the trade stream
+trade_candles: Dict[str, TradeCandleBuilder] = {coin: TradeCandleBuilder() for coin in COINS}
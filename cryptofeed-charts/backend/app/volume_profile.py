@@ -0,0 +1,108 @@
+"""
+Per-coin volume profile (volume at price) built from the live trade stream.
+Trades land in SLICE_SECONDS time slices of price buckets at the coin's tick
+size — O(1) per trade — so any window is answered by merging the slices it
+covers instead of rescanning trades.
+"""
+import os
+import sys
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from .store import COINS, Trade
+
+SLICE_SECONDS = 60
+MAX_SLICES = 24 * 60  # 24h of 1-minute slices
+
+# Bucket width per coin; PROFILE_TICK_<COIN> overrides
+DEFAULT_TICKS = {"BTC": 10.0, "ETH": 1.0, "SOL": 0.1, "XRP": 0.001}
+
+
+def tick_size(coin: str) -> float:
+    return float(os.environ.get(f"PROFILE_TICK_{coin}", DEFAULT_TICKS.get(coin, 0.01)))
+
+
+# Key int + [buy, sell] list + two floats
+BUCKET_BYTES = sys.getsizeof(10**6) + sys.getsizeof([0.0, 0.0]) + 2 * sys.getsizeof(0.0)
+
+
+class ProfileSlice:
+    __slots__ = ("start", "buckets")
+
+    def __init__(self, start: int):
+        self.start = start
+        # bucket index -> [buy volume, sell volume]
+        self.buckets: Dict[int, List[float]] = {}
+
+
+class VolumeProfile:
+    def __init__(self, tick: float):
+        self.tick = tick
+        self.slices: Deque[ProfileSlice] = deque(maxlen=MAX_SLICES)
+        self._lock = threading.Lock()
+
+    def add(self, trade: Trade):
+        start = trade.time // 1000 // SLICE_SECONDS * SLICE_SECONDS
+        bucket = int(trade.price // self.tick)
+        buy = trade.side == "buy"
+        with self._lock:
+            if not self.slices or self.slices[-1].start < start:
+                self.slices.append(ProfileSlice(start))
+            current = self.slices[-1]
+            if current.start > start:
+                return  # late trade for a slice that has moved on
+            volumes = current.buckets.get(bucket)
+            if volumes is None:
+                volumes = current.buckets[bucket] = [0.0, 0.0]
+            volumes[0 if buy else 1] += trade.size
+
+    def window(self, start: Optional[int] = None, end: Optional[int] = None, tick: Optional[float] = None) -> dict:
+        """Merged profile for slices overlapping [start, end] (unix seconds).
+        `tick` must be a whole multiple of the base tick; buckets are merged."""
+        factor = 1
+        if tick is not None:
+            factor = round(tick / self.tick)
+            if factor < 1 or abs(factor * self.tick - tick) > self.tick * 1e-6:
+                raise ValueError(f"tick must be a multiple of {self.tick}")
+        merged: Dict[int, List[float]] = {}
+        first = last = None
+        with self._lock:
+            for s in self.slices:
+                if start is not None and s.start + SLICE_SECONDS <= start:
+                    continue
+                if end is not None and s.start > end:
+                    break
+                first = s.start if first is None else first
+                last = s.start + SLICE_SECONDS
+                for bucket, (buy, sell) in s.buckets.items():
+                    volumes = merged.get(bucket // factor)
+                    if volumes is None:
+                        volumes = merged[bucket // factor] = [0.0, 0.0]
+                    volumes[0] += buy
+                    volumes[1] += sell
+
+        width = self.tick * factor
+        levels = [
+            {"price": round(bucket * width, 10), "buy": buy, "sell": sell, "volume": buy + sell}
+            for bucket, (buy, sell) in sorted(merged.items())
+        ]
+        poc = max(levels, key=lambda level: level["volume"])["price"] if levels else None
+        return {
+            "tick": width,
+            "start": first,
+            "end": last,
+            "poc": poc,
+            "total": sum(level["volume"] for level in levels),
+            "levels": levels,
+        }
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sys.getsizeof(self.slices) + sum(
+                sys.getsizeof(s.buckets) + len(s.buckets) * BUCKET_BYTES for s in self.slices
+            )
+
+
+# Global profiles — one per coin, fed from the trade stream
+volume_profiles: Dict[str, VolumeProfile] = {coin: VolumeProfile(tick_size(coin)) for coin in COINS}
@@ -0,0 +1 @@
+"""Microbenchmarks for the charts API hot paths."""
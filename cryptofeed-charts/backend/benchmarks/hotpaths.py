@@ -0,0 +1,228 @@
+"""
+Microbenchmarks for the store and callback hot paths.
+
+Run from the backend directory:
+
+    python -m benchmarks.hotpaths
+    python -m benchmarks.hotpaths --only broadcast --json bench.json
+
+Each case reports ops/sec (best of several rounds), the transient peak
+allocation of one op and the bytes / blocks it leaves behind, as seen by
+tracemalloc. Sizes mirror production: full 500-bar candle deques, 1k
+subscriber queues, deep books.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from app.store import MAX_CANDLES, BookSnapshot, CandleBar, CoinStore, Trade
+
+SUBSCRIBERS = 1_000
+BOOK_DEPTH = 5_000
+ROUNDS = 5
+
+
+class Case:
+    __slots__ = ("name", "fn", "number", "ops_per_call", "teardown")
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], object],
+        number: int,
+        ops_per_call: int = 1,
+        teardown: Optional[Callable[[], None]] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.number = number
+        self.ops_per_call = ops_per_call
+        self.teardown = teardown
+
+
+def _bar(t: int, price: float) -> CandleBar:
+    return CandleBar(time=t, open=price, high=price + 5, low=price - 5, close=price + 1, volume=12.5)
+
+
+def _full_store() -> CoinStore:
+    cs = CoinStore()
+    for tf in cs.candles:
+        for i in range(MAX_CANDLES):
+            cs.update_candle(tf, _bar(1_700_000_000 + i * 60, 60_000.0 + i))
+    return cs
+
+
+def _time_case(case: Case) -> float:
+    """Best ops/sec over ROUNDS rounds of `case.number` calls."""
+    fn = case.fn
+    best = float("inf")
+    for _ in range(ROUNDS):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(case.number):
+                fn()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        if case.teardown:
+            case.teardown()
+    return case.number * case.ops_per_call / best if best > 0 else float("inf")
+
+
+def _alloc_case(case: Case) -> Dict[str, float]:
+    """Transient peak of a single call and retained memory per op."""
+    fn = case.fn
+    calls = max(1, min(case.number, 200))
+    fn()  # warm caches / lazy attributes outside the trace
+    if case.teardown:
+        case.teardown()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+
+        before = tracemalloc.take_snapshot()
+        for _ in range(calls):
+            fn()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    if case.teardown:
+        case.teardown()
+
+    stats = after.compare_to(before, "filename")
+    retained = sum(s.size_diff for s in stats)
+    blocks = sum(s.count_diff for s in stats)
+    ops = calls * case.ops_per_call
+    return {
+        "peak_bytes_per_op": round((peak - base) / case.ops_per_call, 1),
+        "retained_bytes_per_op": round(max(retained, 0) / ops, 1),
+        "retained_blocks_per_op": round(max(blocks, 0) / ops, 2),
+    }
+
+
+# ── Cases ────────────────────────────────────────────────────
+
+
+def store_cases() -> List[Case]:
+    cs = _full_store()
+    last = cs.candles["1m"][-1].time
+    in_progress = _bar(last, 61_000.0)
+    counter = {"t": last}
+
+    def update_in_progress():
+        cs.update_candle("1m", in_progress)
+
+    def update_new_bar():
+        counter["t"] += 60
+        cs.update_candle("1m", _bar(counter["t"], 61_000.0))
+
+    bar = cs.candles["1m"][-1]
+    trade = Trade(price=61_000.5, size=0.013, side="buy", time=1_700_000_000_000)
+
+    return [
+        Case("store.update_candle (in-progress)", update_in_progress, 200_000),
+        Case("store.update_candle (new bar)", update_new_bar, 200_000),
+        Case(f"store.get_candles ({MAX_CANDLES} bars)", lambda: cs.get_candles("1m"), 500),
+        Case("CandleBar.to_dict", bar.to_dict, 200_000),
+        Case("Trade.to_dict", trade.to_dict, 200_000),
+    ]
+
+
+def book_cases() -> List[Case]:
+    rng = random.Random(7)
+    mid = 61_000.0
+    bids = sorted({round(mid - rng.uniform(0.01, 500), 2) for _ in range(BOOK_DEPTH)})
+    asks = sorted({round(mid + rng.uniform(0.01, 500), 2) for _ in range(BOOK_DEPTH)})
+
+    snap = BookSnapshot()
+    snap.bid = bids[-1]
+    snap.ask = asks[0]
+
+    def top_of_book():
+        # Mirrors book_cb: best bid/ask extraction from a deep book
+        snap.bid = float(max(bids))
+        snap.ask = float(min(asks))
+
+    return [
+        Case("BookSnapshot.spread", lambda: snap.spread, 200_000),
+        Case("BookSnapshot.to_dict", snap.to_dict, 200_000),
+        Case(f"book_cb top-of-book ({len(bids)}x{len(asks)} levels)", top_of_book, 500),
+    ]
+
+
+def broadcast_cases() -> List[Case]:
+    from app import feed_manager
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    coin = "BTC"
+    queues = [asyncio.Queue() for _ in range(SUBSCRIBERS)]
+    for queue in queues:
+        feed_manager.subscribe(coin, queue)
+
+    msg = {"type": "trade", "data": Trade(61_000.5, 0.013, "buy", 1_700_000_000_000).to_dict()}
+    batch = 50
+
+    async def _fan_out():
+        for _ in range(batch):
+            await feed_manager._broadcast(coin, msg)
+
+    def run():
+        loop.run_until_complete(_fan_out())
+
+    def drain():
+        for queue in queues:
+            queue._queue.clear()  # type: ignore[attr-defined]
+
+    return [
+        Case(f"_broadcast ({SUBSCRIBERS} queues)", run, 20, ops_per_call=batch, teardown=drain),
+    ]
+
+
+GROUPS = {
+    "store": store_cases,
+    "book": book_cases,
+    "broadcast": broadcast_cases,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", choices=sorted(GROUPS), action="append", help="run only these groups")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'case':<48} {'ops/sec':>14} {'peak B/op':>11} {'kept B/op':>10} {'blocks/op':>10}")
+    for group in args.only or list(GROUPS):
+        for case in GROUPS[group]():
+            ops = _time_case(case)
+            alloc = _alloc_case(case)
+            results.append({"group": group, "case": case.name, "ops_per_sec": round(ops, 1), **alloc})
+            print(
+                f"{case.name:<48} {ops:>14,.0f} "
+                f"{alloc['peak_bytes_per_op']:>11,.1f} {alloc['retained_bytes_per_op']:>10,.1f} "
+                f"{alloc['retained_blocks_per_op']:>10.2f}"
+            )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Alert rule index and engine limits.
+Run from backend/: python -m pytest tests
+"""
+import asyncio
+import math
+
+import pytest
+
+from app import alerts, feed_manager
+from app.alerts import AlertEngine, CrossingIndex, Rule
+
+
+def _index(op: str, thresholds) -> CrossingIndex:
+    index = CrossingIndex()
+    for i, threshold in enumerate(thresholds, 1):
+        index.add(Rule(i, "BTC", "price", op, threshold))
+    return index
+
+
+def test_crossed_above_returns_thresholds_in_range():
+    index = _index("above", [100, 50, 200, 150])
+    assert sorted(index.crossed(40, 120)) == [1, 2]   # 50 and 100
+    assert sorted(index.crossed(120, 200)) == [3, 4]  # 150 and 200 (inclusive)
+    assert index.crossed(120, 120) == []
+    assert index.crossed(120, 110) == []
+
+
+def test_crossed_below_returns_thresholds_in_range():
+    index = _index("below", [100, 50, 200, 150])
+    assert sorted(index.crossed(160, 50)) == [1, 2, 4]
+    assert index.crossed(50, 40) == []  # prev already at the threshold
+
+
+def test_nan_threshold_would_break_the_index():
+    # Why add() rejects it: a NaN in the sorted list hides other rules
+    index = _index("above", [100, math.nan, 50, 200, 150])
+    assert sorted(index.crossed(40, 120)) != [1, 3]
+
+
+@pytest.mark.parametrize("threshold", [math.nan, math.inf, -math.inf])
+def test_add_rejects_non_finite_threshold(threshold):
+    with pytest.raises(ValueError):
+        AlertEngine().add("BTC", "price", "above", threshold)
+
+
+def test_rule_cap_is_per_client(monkeypatch):
+    monkeypatch.setattr(alerts, "MAX_RULES_PER_CLIENT", 2)
+    engine = AlertEngine()
+    first, _ = engine.add("BTC", "price", "above", 1e9, owner="1.1.1.1")
+    engine.add("BTC", "price", "above", 1e9, owner="1.1.1.1")
+    with pytest.raises(ValueError):
+        engine.add("ETH", "price", "above", 1e9, owner="1.1.1.1")
+    engine.add("BTC", "price", "above", 1e9, owner="2.2.2.2")  # others unaffected
+    engine.remove(first.id)
+    engine.add("BTC", "price", "above", 1e9, owner="1.1.1.1")  # slot freed
+
+
+def test_immediate_trigger_goes_out_on_the_alert_channel(monkeypatch):
+    engine = AlertEngine()
+    engine.on_value("BTC", "price", 100.0)
+    rule, trigger = engine.add("BTC", "price", "above", 90.0)
+    assert trigger is not None and trigger["id"] == rule.id
+
+    q: asyncio.Queue = asyncio.Queue()
+    monkeypatch.setattr(feed_manager, "_feed_loop", None)
+    monkeypatch.setattr(feed_manager, "_serving_loop", None)
+
+    async def run():
+        feed_manager.subscribe("BTC", q, ["alert"])
+        try:
+            feed_manager.publish_alerts("BTC", [trigger])
+            return await asyncio.wait_for(q.get(), 1)
+        finally:
+            feed_manager.unsubscribe("BTC", q)
+
+    frame = asyncio.run(run())
+    assert '"type": "alert"' in frame and f'"id": {rule.id}' in frame
@@ -0,0 +1,76 @@
+"""
+Candle ring ordering with trade-built 1m bars (LOCAL_1M=1).
+Run from backend/: python -m pytest tests
+"""
+import asyncio
+import json
+
+from app import feed_manager
+from app.indicators import IndicatorHub, build
+from app.store import CandleBar, CoinStore, Trade
+from app.trade_candles import TradeCandleBuilder
+
+T = 1_718_000_040  # a minute boundary
+
+
+def _bar(time: int, close: float) -> CandleBar:
+    return CandleBar(time, close, close, close, close, 1.0)
+
+
+def test_late_bar_replaces_same_time():
+    cs = CoinStore()
+    cs.update_candle("1m", _bar(T - 60, 1.0))
+    cs.update_candle("1m", _bar(T, 2.0))
+    assert cs.update_candle("1m", _bar(T - 60, 3.0)) is False
+    assert [(b.time, b.close) for b in cs.candles["1m"]] == [(T - 60, 3.0), (T, 2.0)]
+
+
+def test_late_bar_without_match_is_dropped():
+    cs = CoinStore()
+    cs.update_candle("1m", _bar(T - 120, 1.0))
+    cs.update_candle("1m", _bar(T, 2.0))
+    assert cs.update_candle("1m", _bar(T - 60, 3.0)) is None
+    assert [b.time for b in cs.candles["1m"]] == [T - 120, T]
+
+
+def test_closed_kline_after_trade_opened_next_bar(monkeypatch):
+    cs = CoinStore()
+    monkeypatch.setattr(feed_manager, "LOCAL_1M", True)
+    monkeypatch.setitem(feed_manager.store, "BTC", cs)
+    monkeypatch.setitem(feed_manager.trade_candles, "BTC", TradeCandleBuilder(["1m"]))
+    monkeypatch.setattr(feed_manager, "_serving_loop", None)
+    hub = IndicatorHub()
+    monkeypatch.setattr(feed_manager, "indicator_hub", hub)
+    monkeypatch.setattr("app.indicators.store", feed_manager.store)
+    q: asyncio.Queue = asyncio.Queue()
+    kline = CandleBar(T - 60, 99.0, 102.0, 98.0, 50.0, 7.0)
+    stale = []
+
+    cs.update_candle("1m", _bar(T - 120, 90.0))  # seeded history
+
+    async def run():
+        feed_manager.subscribe("BTC", q, ["indicator:1m:ema:2"])
+        try:
+            await feed_manager.apply_trade("BTC", Trade(100.0, 1.0, "buy", (T - 30) * 1000))
+            await feed_manager.apply_trade("BTC", Trade(101.0, 1.0, "buy", T * 1000))  # opens bar T
+            hub.acquire("BTC", "1m:ema:2")
+            stale.extend(hub.points("BTC", "1m:ema:2"))
+            await feed_manager.apply_candle("BTC", (kline, True))
+        finally:
+            feed_manager.unsubscribe("BTC", q)
+
+    asyncio.run(run())
+    bars = list(cs.candles["1m"])
+    assert [b.time for b in bars] == [T - 120, T - 60, T]
+    assert bars[1].volume == 7.0  # the closed kline replaced the trade-built bar
+
+    frames = [json.loads(q.get_nowait()) for _ in range(q.qsize())]
+    fixes = [f["data"] for f in frames if f["type"] == "candle_fix"]
+    assert fixes == [kline.to_dict()]
+    assert not any(f["type"] == "candle" and f["data"]["time"] == T - 60 for f in frames)
+    # The overlay is recomputed from the corrected bar and both points go out
+    expected = build("ema", 2, bars).points
+    assert hub.points("BTC", "1m:ema:2") == list(expected) != stale
+    sent = {f["type"]: f["data"] for f in frames if f.get("ch") == "indicator:1m:ema:2"}
+    assert sent["indicator_fix"]["time"] == T - 60 and sent["indicator"]["time"] == T
+    assert sent["indicator"]["value"] == expected[-1]["value"]
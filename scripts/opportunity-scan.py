@@ -12,20 +12,37 @@ Pillars:
 
 Usage: python3 opportunity-scan.py
 Output: JSON to stdout
+Requires: httpx (falls back to requests); numpy optional
+
+Daemon: python3 opportunity-scan.py --daemon [--interval 300] [--output FILE] [--socket PATH] [--stub]
+Keeps candles, funding and mark prices warm from Binance streams and
+republishes the same JSON to FILE and/or as lines on a Unix socket.
 """
 
+import argparse
+import asyncio
 import json
+import signal
 import sys
 import os
 import time
 from datetime import datetime, timezone
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # fall back to requests, one worker thread per in-flight call
+    try:
+        import requests
+    except ImportError:
+        print(json.dumps({"error": "httpx library not installed. Run: pip install httpx"}))
+        sys.exit(1)
 
 try:
-    import requests
+    import numpy as np   # optional: batched indicators for the whole universe
 except ImportError:
-    print(json.dumps({"error": "requests library not installed. Run: pip install requests"}))
-    sys.exit(1)
+    np = None
 
 # ---------------------------------------------------------------------------
 # Config
@@ -33,14 +50,44 @@ except ImportError:
 
 BASE_URL = "https://fapi.binance.com"
 STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".opportunity-state.json")
+KLINE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".kline-cache.json")
 
 MIN_VOLUME_USDT = 60_000_000   # $60M daily quote volume minimum
-STAGE1_LIMIT    = 60           # candidates after volume filter
+# Candidates after the volume filter; 0 keeps the whole USDT-perp universe
+STAGE1_LIMIT    = int(os.environ.get("OPPORTUNITY_STAGE1_LIMIT", "60"))
 DEEP_LIMIT      = 10           # max assets for full deep-dive
 TOP_OUTPUT      = 6            # max opportunities in output
 
 REQUEST_TIMEOUT = 12           # seconds per HTTP call
-MAX_CONCURRENT  = 8            # concurrent threads for deep dive
+MAX_CONCURRENT  = 16           # in-flight HTTP requests (= keep-alive pool size)
+
+# Binance Futures allows 2400 request weight per IP per minute; stay well
+# under it so a scan never trips a 429 (and repeated 429s become 418 bans)
+WEIGHT_LIMIT    = 2400
+WEIGHT_BUDGET   = int(WEIGHT_LIMIT * 0.8)
+
+# Closed bars kept per (symbol, interval) across runs. KLINE_DEPTH is the
+# most any stage reads, so stage 2's 22-bar 1h check and the deep dive's
+# 52-bar read are served by the same download.
+INTERVAL_MS     = {"15m": 900_000, "1h": 3_600_000, "4h": 14_400_000}
+KLINE_DEPTH     = {"15m": 35, "1h": 52, "4h": 30}
+KLINE_CACHE_BARS = 200
+KLINE_SEED_BARS = 99           # first fetch per key; the most at weight 1
+KLINE_OPEN_TTL  = 30           # seconds an in-progress bar is reused within a run
+SIGNAL_TTL      = 0            # seconds per-symbol positioning data is reused (daemon only)
+
+# Daemon mode (--daemon): candles and funding stay warm from the combined
+# kline / markPrice streams and the scan is re-run from memory
+WS_URL          = "wss://fstream.binance.com/stream?streams="
+STREAMS_PER_CONNECTION = 200   # Binance's cap per combined-stream connection
+DAEMON_OPEN_TTL = 120          # in-progress bars stay fresh while the stream is up
+DAEMON_SIGNAL_TTL = 300        # positioning data is hourly; refetch every 5 min
+TICKER_REFRESH  = 60           # seconds between bulk 24h ticker pulls
+EVENT_DEBOUNCE  = 3            # seconds to collect bar closes before re-scoring
+EVENT_MIN_GAP   = 10           # seconds between event-driven re-scores
+EVENT_MOVE_PCT  = 1.0          # mark move (%) on a listed opportunity that re-scores
+CLIENT_BACKLOG  = 2            # snapshots queued per socket client before it is dropped
+CLIENT_DRAIN_TIMEOUT = 10      # seconds a socket client may take to accept one snapshot
 
 EXCLUDE_SYMBOLS = {
     "USDCUSDT", "BUSDUSDT", "TUSDUSDT", "USDTUSDT", "DAIUSDT",
@@ -49,23 +96,143 @@ EXCLUDE_SYMBOLS = {
 EXCLUDE_SUFFIXES = {"BULL", "BEAR", "UP", "DOWN", "3L", "3S", "5L", "5S"}
 
 # ---------------------------------------------------------------------------
-# HTTP helpers
+# HTTP engine
 # ---------------------------------------------------------------------------
 
-SESSION = requests.Session()
-SESSION.headers.update({"Accept": "application/json"})
+def request_weight(path, params):
+    """Binance's documented weight for the endpoints the scanner uses."""
+    params = params or {}
+    if path == "/fapi/v1/klines":
+        limit = params.get("limit", 500)
+        if limit < 100:  return 1
+        if limit < 500:  return 2
+        if limit <= 1000: return 5
+        return 10
+    if path == "/fapi/v1/ticker/24hr":
+        return 1 if "symbol" in params else 40
+    if path == "/fapi/v1/premiumIndex":
+        return 1 if "symbol" in params else 10
+    return 1
+
+
+class WeightBudget:
+    """Tracks request weight used in the current minute. Requests reserve
+    their weight before going out; X-MBX-USED-WEIGHT-1M on each response
+    replaces our estimate with Binance's own count."""
+
+    def __init__(self, budget=WEIGHT_BUDGET):
+        self.budget = budget
+        self.window = int(time.time() // 60)
+        self.used = 0          # as last reported by Binance (or estimated)
+        self.reserved = 0      # weight of requests in flight
+        self.paused_until = 0.0
+        self.peak = 0
+
+    def _roll(self, now):
+        minute = int(now // 60)
+        if minute != self.window:
+            self.window = minute
+            self.used = 0
+
+    async def acquire(self, weight):
+        while True:
+            now = time.time()
+            self._roll(now)
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            if self.used + self.reserved + weight <= self.budget:
+                self.reserved += weight
+                return
+            # Budget spent: wait for Binance's next minute window
+            await asyncio.sleep(60 - now % 60 + 0.25)
+
+    def settle(self, weight, used_header):
+        self.reserved -= weight
+        self._roll(time.time())
+        if used_header is not None:
+            try:
+                self.used = int(used_header)
+            except ValueError:
+                self.used += weight
+        else:
+            self.used += weight
+        self.peak = max(self.peak, self.used)
+
+    def pause(self, seconds):
+        """429 / 418: hold every request until Binance lets us back in."""
+        self.paused_until = max(self.paused_until, time.time() + seconds)
 
 
-def get_json(url, params=None, retries=2):
-    for attempt in range(retries + 1):
-        try:
-            r = SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
-            r.raise_for_status()
-            return r.json()
-        except Exception:
-            if attempt < retries:
-                time.sleep(0.3 * (attempt + 1))
-    return None
+class RequestsClient:
+    """The slice of httpx.AsyncClient BinanceHttp uses, over a requests
+    session run in worker threads (environments without httpx)."""
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept"] = "application/json"
+
+    async def get(self, path, params=None):
+        return await asyncio.to_thread(self.session.get, BASE_URL + path, params=params, timeout=REQUEST_TIMEOUT)
+
+    async def aclose(self):
+        self.session.close()
+
+
+class BinanceHttp:
+    """One keep-alive pool for the whole scan; MAX_CONCURRENT requests in
+    flight at most, all drawing from one weight budget."""
+
+    def __init__(self, transport=None):
+        if httpx is None:
+            self.client = RequestsClient()
+        else:
+            self.client = httpx.AsyncClient(
+                base_url=BASE_URL,
+                transport=transport,
+                headers={"Accept": "application/json"},
+                timeout=REQUEST_TIMEOUT,
+                limits=httpx.Limits(max_connections=MAX_CONCURRENT,
+                                    max_keepalive_connections=MAX_CONCURRENT,
+                                    keepalive_expiry=30),
+            )
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+        self.weight = WeightBudget()
+        self.requests = 0
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def get_json(self, path, params=None, retries=2):
+        weight = request_weight(path, params)
+        for attempt in range(retries + 1):
+            await self.weight.acquire(weight)
+            used = None
+            try:
+                async with self.semaphore:
+                    self.requests += 1
+                    r = await self.client.get(path, params=params)
+                used = r.headers.get("x-mbx-used-weight-1m")
+                if r.status_code in (418, 429):
+                    self.weight.pause(float(r.headers.get("retry-after", 60)))
+                    continue
+                r.raise_for_status()
+                return r.json()
+            except Exception:
+                if attempt < retries:
+                    await asyncio.sleep(0.3 * (attempt + 1))
+            finally:
+                self.weight.settle(weight, used)
+        return None
+
+
+HTTP = None  # BinanceHttp, created inside the running loop by main()
+
+
+async def get_json(path, params=None, retries=2):
+    return await HTTP.get_json(path, params, retries)
 
 
 # ---------------------------------------------------------------------------
@@ -156,25 +323,298 @@ def support_resistance(highs, lows, n=20):
     return (round(min(rl), 6), round(max(rh), 6)) if rh and rl else (None, None)
 
 
+# ---------------------------------------------------------------------------
+# Batched indicators (NumPy)
+# ---------------------------------------------------------------------------
+#
+# The same formulas as the functions above, computed for a symbols x bars
+# matrix at once. Recurrences still step through the bars in the original
+# order (vectorized across symbols), sums accumulate left to right like
+# sum(), and the final rounding uses Python's round(), so every value is
+# bit-identical to the per-symbol functions.
+
+def _seq_sum(m, start, stop):
+    acc = np.zeros(m.shape[0])
+    for j in range(start, stop):
+        acc = acc + m[:, j]
+    return acc
+
+
+def batch_rsi(closes, period=14):
+    n_sym, n = closes.shape
+    if n < period + 2:
+        return [50.0] * n_sym
+    deltas = closes[:, 1:] - closes[:, :-1]
+    gains = np.maximum(deltas, 0.0)
+    losses = np.maximum(-deltas, 0.0)
+    avg_g = _seq_sum(gains, 0, period) / period
+    avg_l = _seq_sum(losses, 0, period) / period
+    for i in range(period, n - 1):
+        avg_g = (avg_g * (period - 1) + gains[:, i]) / period
+        avg_l = (avg_l * (period - 1) + losses[:, i]) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - (100.0 / (1.0 + avg_g / avg_l))
+    return [100.0 if l == 0 else round(float(r), 2) for r, l in zip(rsi, avg_l)]
+
+
+def batch_ema(closes, period):
+    n_sym, n = closes.shape
+    if n < period:
+        return [float(c) for c in closes[:, -1]] if n else [0.0] * n_sym
+    k = 2.0 / (period + 1)
+    ema = _seq_sum(closes, 0, period) / period
+    for j in range(period, n):
+        ema = closes[:, j] * k + ema * (1 - k)
+    return [float(e) for e in ema]
+
+
+def batch_atr_pct(highs, lows, closes, period=14):
+    n_sym, n = closes.shape
+    if n < 2:
+        return [1.0] * n_sym
+    stop = min(n, period + 1)
+    prev = closes[:, :stop - 1]
+    h, l = highs[:, 1:stop], lows[:, 1:stop]
+    trs = np.maximum(np.maximum(h - l, np.abs(h - prev)), np.abs(l - prev))
+    atr = _seq_sum(trs, 0, stop - 1) / (stop - 1)
+    price = closes[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = (atr / price) * 100
+    return [round(float(x), 3) if p > 0 else 1.0 for x, p in zip(pct, price)]
+
+
+def batch_volume_ratio(vols):
+    n_sym, n = vols.shape
+    if n < 3:
+        return [1.0] * n_sym
+    start = max(0, n - 1 - 20)
+    avg = _seq_sum(vols, start, n - 1) / (n - 1 - start)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = vols[:, -1] / avg
+    return [round(float(r), 2) if a > 0 else 1.0 for r, a in zip(ratio, avg)]
+
+
+def batch_patterns(closes, opens, highs, lows):
+    n_sym, n = closes.shape
+    if n < 5:
+        return [[] for _ in range(n_sym)]
+    c, o, h, l = closes, opens, highs, lows
+    higher = (h[:, -1] > h[:, -3]) & (l[:, -1] > l[:, -3])
+    lower = (h[:, -1] < h[:, -3]) & (l[:, -1] < l[:, -3])
+    total = np.zeros(n_sym)
+    count = np.zeros(n_sym)
+    for i in range(1, 4):
+        valid = c[:, -i] > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = (h[:, -i] - l[:, -i]) / c[:, -i]
+        total = np.where(valid, total + r, total)
+        count += valid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        consolidation = (count > 0) & (total / count < 0.005)
+    prev_body = np.abs(c[:, -2] - o[:, -2])
+    curr_body = np.abs(c[:, -1] - o[:, -1])
+    bull = (c[:, -1] > o[:, -1]) & (o[:, -1] < c[:, -2]) & (c[:, -1] > o[:, -2]) & (curr_body > prev_body)
+    bear = (c[:, -1] < o[:, -1]) & (o[:, -1] > c[:, -2]) & (c[:, -1] < o[:, -2]) & (curr_body > prev_body)
+    patterns = []
+    for i in range(n_sym):
+        found = []
+        if higher[i]:
+            found.append("higher_highs")
+        elif lower[i]:
+            found.append("lower_lows")
+        if consolidation[i]:
+            found.append("consolidation")
+        if bull[i]:
+            found.append("bull_engulf")
+        elif bear[i]:
+            found.append("bear_engulf")
+        patterns.append(found)
+    return patterns
+
+
+def _indicators_one(opens, highs, lows, closes, vols):
+    return {
+        "rsi":        calculate_rsi(closes),
+        "ema20":      calculate_ema(closes, 20),
+        "atr_pct":    calculate_atr_pct(highs, lows, closes),
+        "vol_ratio":  volume_ratio(vols),
+        "patterns":   detect_patterns(closes, opens, highs, lows),
+    }
+
+
+def indicator_matrix(klines_list):
+    """Same-length (opens, highs, lows, closes, vols) tuples -> one
+    (symbols, 5, bars) float array."""
+    n_bars = len(klines_list[0][3])
+    flat = chain.from_iterable(chain.from_iterable(klines_list))
+    return np.fromiter(flat, float, len(klines_list) * 5 * n_bars).reshape(len(klines_list), 5, n_bars)
+
+
+def batch_indicators_matrix(m):
+    """One vectorized pass over a (symbols, 5, bars) array; a list of
+    indicator dicts in row order."""
+    o, h, l, c, v = (m[:, i, :] for i in range(5))
+    cols = zip(batch_rsi(c), batch_ema(c, 20), batch_atr_pct(h, l, c),
+               batch_volume_ratio(v), batch_patterns(c, o, h, l))
+    return [{"rsi": rsi, "ema20": ema20, "atr_pct": atr, "vol_ratio": vol_r, "patterns": pats}
+            for rsi, ema20, atr, vol_r, pats in cols]
+
+
+def batch_indicators(klines_by_symbol):
+    """{symbol: (opens, highs, lows, closes, vols)} -> {symbol: indicators}.
+    Symbols are grouped by bar count (new listings have short histories)
+    and each group is one symbols x bars pass. Without NumPy, falls back to
+    the per-symbol functions."""
+    if np is None:
+        return {sym: _indicators_one(*k) for sym, k in klines_by_symbol.items()}
+    groups = {}
+    for sym, k in klines_by_symbol.items():
+        groups.setdefault(len(k[3]), []).append(sym)
+    out = {}
+    for syms in groups.values():
+        m = indicator_matrix([klines_by_symbol[s] for s in syms])
+        out.update(zip(syms, batch_indicators_matrix(m)))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Kline cache
+# ---------------------------------------------------------------------------
+
+def _bar(k):
+    """Binance kline row -> [open_time, open, high, low, close, volume]."""
+    return [int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])]
+
+
+class KlineCache:
+    """Closed bars per (symbol, interval), persisted in KLINE_CACHE_FILE.
+    A read fetches only the bars closed since the last run plus the
+    in-progress one, which Binance always returns last and which is never
+    persisted."""
+
+    def __init__(self, path=None):
+        self.path = path or KLINE_CACHE_FILE
+        self.closed = {}       # "SYMBOL|interval" -> [bar, ...] oldest first
+        self.open = {}         # key -> (fetched at, in-progress bar)
+        self.locks = {}
+        self.hits = self.tail_fetches = self.full_fetches = 0
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.closed = data.get("klines", {})
+        except Exception:
+            self.closed = {}
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"klines": self.closed}, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+    def apply(self, symbol, interval, bar, closed):
+        """A kline stream update (daemon). Keys not read yet are ignored;
+        the first read seeds them over REST. Returns True when a bar closed."""
+        key = f"{symbol}|{interval}"
+        bars = self.closed.get(key)
+        step = INTERVAL_MS.get(interval)
+        if not bars or step is None:
+            return False
+        if bar[0] <= bars[-1][0]:
+            if closed and bar[0] == bars[-1][0]:
+                bars[-1] = bar
+            return False
+        if bar[0] != bars[-1][0] + step:
+            # A bar closed while we were not listening; the next read
+            # refetches the tail over REST
+            self.open.pop(key, None)
+            return False
+        if not closed:
+            self.open[key] = (time.time(), bar, len(bars) + 1)
+            return False
+        bars.append(bar)
+        del bars[:-KLINE_CACHE_BARS]
+        # Until the next bar's first update, serve it flat at the close
+        c = bar[4]
+        self.open[key] = (time.time(), [bar[0] + step, c, c, c, c, 0.0], len(bars) + 1)
+        return True
+
+    async def get(self, symbol, interval, limit):
+        """The last `limit` bars, in-progress bar included; None on failure."""
+        key = f"{symbol}|{interval}"
+        lock = self.locks.get(key)
+        if lock is None:
+            lock = self.locks[key] = asyncio.Lock()
+        async with lock:
+            if not await self._refresh(key, symbol, interval, max(limit, KLINE_DEPTH.get(interval, limit))):
+                return None
+        return self.closed[key][-(limit - 1):] + [self.open[key][1]] if limit > 1 else [self.open[key][1]]
+
+    async def _refresh(self, key, symbol, interval, depth):
+        step = INTERVAL_MS[interval]
+        now = time.time()
+        current = int(now * 1000) // step * step
+        fetched = self.open.get(key)
+        if fetched and now - fetched[0] < KLINE_OPEN_TTL and fetched[1][0] >= current and fetched[2] >= depth:
+            self.hits += 1
+            return True
+
+        # Only the tail is missing when the cache already reaches back far
+        # enough; one extra bar so Binance's in-progress bar is included
+        # even if our clock is slightly behind its bar boundary
+        bars = self.closed.get(key, [])
+        missing = (current - bars[-1][0]) // step if bars else 0
+        if bars and len(bars) >= depth - 1 and 0 <= missing < 1000:
+            params = {"symbol": symbol, "interval": interval,
+                      "startTime": bars[-1][0] + step, "limit": missing + 1}
+            self.tail_fetches += 1
+        else:
+            params = {"symbol": symbol, "interval": interval, "limit": max(depth, KLINE_SEED_BARS)}
+            bars = []
+            self.full_fetches += 1
+        data = await get_json("/fapi/v1/klines", params=params)
+        if not data or not isinstance(data, list):
+            return False
+        new = [_bar(k) for k in data]
+        merged = {b[0]: b for b in bars}
+        merged.update((b[0], b) for b in new[:-1])
+        closed = [merged[t] for t in sorted(merged)][-KLINE_CACHE_BARS:]
+        # A gap (missed bars, trading halt) means the cached history no
+        # longer lines up with what Binance would return; start over
+        recent = closed[-depth:] + new[-1:]
+        if bars and any(b[0] - a[0] != step for a, b in zip(recent, recent[1:])):
+            self.closed.pop(key, None)
+            return await self._refresh(key, symbol, interval, depth)
+        self.closed[key] = closed
+        self.open[key] = (now, new[-1], depth)
+        return True
+
+
+KLINES = None  # KlineCache, loaded by main()
+
+
 # ---------------------------------------------------------------------------
 # Binance API fetchers
 # ---------------------------------------------------------------------------
 
-def fetch_klines(symbol, interval, limit):
-    data = get_json(f"{BASE_URL}/fapi/v1/klines",
-                    params={"symbol": symbol, "interval": interval, "limit": limit})
-    if not data or not isinstance(data, list):
+async def fetch_klines(symbol, interval, limit):
+    data = await KLINES.get(symbol, interval, limit)
+    if not data:
         return None
-    opens  = [float(k[1]) for k in data]
-    highs  = [float(k[2]) for k in data]
-    lows   = [float(k[3]) for k in data]
-    closes = [float(k[4]) for k in data]
-    vols   = [float(k[5]) for k in data]
+    opens  = [k[1] for k in data]
+    highs  = [k[2] for k in data]
+    lows   = [k[3] for k in data]
+    closes = [k[4] for k in data]
+    vols   = [k[5] for k in data]
     return opens, highs, lows, closes, vols
 
 
-def fetch_top_long_short(symbol):
-    data = get_json(f"{BASE_URL}/futures/data/topLongShortPositionRatio",
+async def fetch_top_long_short(symbol):
+    data = await get_json("/futures/data/topLongShortPositionRatio",
                     params={"symbol": symbol, "period": "1h", "limit": 3})
     if data and isinstance(data, list) and data:
         try:
@@ -184,8 +624,8 @@ def fetch_top_long_short(symbol):
     return None
 
 
-def fetch_taker_ratio(symbol):
-    data = get_json(f"{BASE_URL}/futures/data/takerlongshortRatio",
+async def fetch_taker_ratio(symbol):
+    data = await get_json("/futures/data/takerlongshortRatio",
                     params={"symbol": symbol, "period": "1h", "limit": 3})
     if data and isinstance(data, list) and data:
         try:
@@ -195,8 +635,8 @@ def fetch_taker_ratio(symbol):
     return None
 
 
-def fetch_oi_change(symbol):
-    data = get_json(f"{BASE_URL}/futures/data/openInterestHist",
+async def fetch_oi_change(symbol):
+    data = await get_json("/futures/data/openInterestHist",
                     params={"symbol": symbol, "period": "1h", "limit": 5})
     if data and isinstance(data, list) and len(data) >= 2:
         try:
@@ -209,10 +649,9 @@ def fetch_oi_change(symbol):
     return None
 
 
-def fetch_funding_rate(symbol):
-    data = get_json(f"{BASE_URL}/fapi/v1/premiumIndex", params={"symbol": symbol})
-    if data and isinstance(data, dict):
-        rate = data.get("lastFundingRate")
+def parse_funding_rate(row):
+    if row and isinstance(row, dict):
+        rate = row.get("lastFundingRate")
         if rate is not None:
             try:
                 return float(rate)
@@ -221,6 +660,25 @@ def fetch_funding_rate(symbol):
     return None
 
 
+async def fetch_funding_rate(symbol):
+    """Per-symbol fallback for when the bulk premium index is unavailable."""
+    return parse_funding_rate(await get_json("/fapi/v1/premiumIndex", params={"symbol": symbol}))
+
+
+async def fetch_market():
+    """Universe-wide data, one bulk call per endpoint, indexed by symbol:
+    24h tickers, and the premium index (funding rate, mark and index price).
+    Tickers are None on failure; the premium index map is empty."""
+    tickers, premium = await asyncio.gather(
+        get_json("/fapi/v1/ticker/24hr"),
+        get_json("/fapi/v1/premiumIndex"),
+    )
+    if not tickers or not isinstance(tickers, list):
+        return None, {}
+    premium_map = {p["symbol"]: p for p in premium if "symbol" in p} if isinstance(premium, list) else {}
+    return tickers, premium_map
+
+
 # ---------------------------------------------------------------------------
 # Scoring
 # ---------------------------------------------------------------------------
@@ -370,17 +828,42 @@ def save_state(state):
 # Per-asset deep analysis
 # ---------------------------------------------------------------------------
 
-def analyze_asset(symbol, ticker_row, prev_state):
-    try:
-        # Fetch klines concurrently within this asset
-        with ThreadPoolExecutor(max_workers=3) as inner:
-            f1h   = inner.submit(fetch_klines, symbol, "1h", 52)
-            f4h   = inner.submit(fetch_klines, symbol, "4h", 30)
-            f15m  = inner.submit(fetch_klines, symbol, "15m", 35)
+_signals = {}
+
+
+async def _cached(fetch, symbol):
+    """Positioning endpoints are hourly aggregates with no stream or bulk
+    form; the daemon reuses them for SIGNAL_TTL seconds."""
+    if SIGNAL_TTL:
+        hit = _signals.get((fetch.__name__, symbol))
+        if hit and time.time() - hit[0] < SIGNAL_TTL:
+            return hit[1]
+    value = await fetch(symbol)
+    if SIGNAL_TTL and value is not None:
+        _signals[(fetch.__name__, symbol)] = (time.time(), value)
+    return value
+
 
-        klines_1h  = f1h.result()
-        klines_4h  = f4h.result()
-        klines_15m = f15m.result()
+async def _funding(symbol, premium_row):
+    if premium_row is not None:
+        return parse_funding_rate(premium_row)
+    return await fetch_funding_rate(symbol)
+
+
+async def analyze_asset(symbol, ticker_row, premium_row, prev_state):
+    try:
+        # Klines and market-data signals all go out together; the shared
+        # engine bounds how many are actually in flight
+        (klines_1h, klines_4h, klines_15m,
+         top_ls, taker_r, oi_chg, funding_rate) = await asyncio.gather(
+            fetch_klines(symbol, "1h", 52),
+            fetch_klines(symbol, "4h", 30),
+            fetch_klines(symbol, "15m", 35),
+            _cached(fetch_top_long_short, symbol),
+            _cached(fetch_taker_ratio, symbol),
+            _cached(fetch_oi_change, symbol),
+            _funding(symbol, premium_row),
+        )
 
         if not klines_1h:
             return None
@@ -395,18 +878,6 @@ def analyze_asset(symbol, ticker_row, prev_state):
         if klines_15m:
             opens_15m, highs_15m, lows_15m, closes_15m, vols_15m = klines_15m
 
-        # Fetch market-data signals concurrently
-        with ThreadPoolExecutor(max_workers=4) as inner:
-            ftls = inner.submit(fetch_top_long_short, symbol)
-            ftkr = inner.submit(fetch_taker_ratio, symbol)
-            foic = inner.submit(fetch_oi_change, symbol)
-            ffnd = inner.submit(fetch_funding_rate, symbol)
-
-        top_ls      = ftls.result()
-        taker_r     = ftkr.result()
-        oi_chg      = foic.result()
-        funding_rate = ffnd.result()
-
         # --- Technicals ---
         rsi_1h  = calculate_rsi(closes_1h)
         rsi_15m = calculate_rsi(closes_15m) if closes_15m else None
@@ -527,20 +998,24 @@ def analyze_asset(symbol, ticker_row, prev_state):
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
-    scan_time  = datetime.now(timezone.utc)
-    prev_state = load_state()
-
-    # --- Fetch all tickers ---
-    all_tickers = get_json(f"{BASE_URL}/fapi/v1/ticker/24hr")
-    if not all_tickers or not isinstance(all_tickers, list):
+async def main():
+    global HTTP, KLINES
+    HTTP = BinanceHttp()
+    KLINES = KlineCache()
+    KLINES.load()
+    try:
+        output = await scan()
+    finally:
+        await HTTP.close()
+        KLINES.save()
+    if output is None:
         print(json.dumps({"error": "Failed to fetch Binance Futures tickers"}))
         sys.exit(1)
+    print(json.dumps(output, default=str))
 
-    ticker_map = {t["symbol"]: t for t in all_tickers}
-    assets_scanned = len(all_tickers)
 
-    # --- Stage 1: volume + symbol filter ---
+def stage1_filter(all_tickers):
+    """Volume + symbol filter: [(symbol, quote volume)], largest first."""
     stage1 = []
     for t in all_tickers:
         sym = t.get("symbol", "")
@@ -557,28 +1032,40 @@ def main():
         stage1.append((sym, vol))
 
     stage1.sort(key=lambda x: -x[1])
-    stage1 = stage1[:STAGE1_LIMIT]
-    passed_stage1 = len(stage1)
+    if STAGE1_LIMIT:
+        stage1 = stage1[:STAGE1_LIMIT]
+    return stage1
 
-    # --- Stage 2: quick 1h RSI + volume ratio filter (parallel) ---
-    def quick_check(sym_vol):
-        sym, _ = sym_vol
-        klines = fetch_klines(sym, "1h", 22)
-        if not klines:
-            return None
-        _, _, _, closes, vols = klines
-        rsi   = calculate_rsi(closes)
-        vol_r = volume_ratio(vols)
-        # Accept RSI 25-78 and not dead volume
-        if 25 <= rsi <= 78 and vol_r >= 0.6:
-            return (sym, rsi, vol_r, ticker_map.get(sym, {}))
+
+async def scan(market=fetch_market, persist=True):
+    """One full scan. `market` returns (tickers, premium map); the daemon
+    serves both from memory. With persist=False the scan streak state is
+    read but not written."""
+    scan_time  = datetime.now(timezone.utc)
+    prev_state = load_state()
+
+    # --- Universe-wide data: tickers + premium index, one call each ---
+    all_tickers, premium_map = await market()
+    if all_tickers is None:
         return None
 
+    ticker_map = {t["symbol"]: t for t in all_tickers}
+    assets_scanned = len(all_tickers)
+
+    # --- Stage 1: volume + symbol filter ---
+    stage1 = stage1_filter(all_tickers)
+    passed_stage1 = len(stage1)
+
+    # --- Stage 2: quick 1h RSI + volume ratio filter (batched) ---
+    klines = await asyncio.gather(*(fetch_klines(sym, "1h", 22) for sym, _ in stage1))
+    quick = batch_indicators({sym: k for (sym, _), k in zip(stage1, klines) if k})
+
     stage2 = []
-    with ThreadPoolExecutor(max_workers=12) as pool:
-        for result in pool.map(quick_check, stage1):
-            if result is not None:
-                stage2.append(result)
+    for sym, _ in stage1:
+        ind = quick.get(sym)
+        # Accept RSI 25-78 and not dead volume
+        if ind and 25 <= ind["rsi"] <= 78 and ind["vol_ratio"] >= 0.6:
+            stage2.append((sym, ind["rsi"], ind["vol_ratio"], ticker_map.get(sym, {})))
 
     passed_stage2 = len(stage2)
 
@@ -592,15 +1079,11 @@ def main():
     deep_targets = stage2[:DEEP_LIMIT]
 
     # --- Deep dive ---
-    def deep(item):
-        sym, _, _, ticker = item
-        return analyze_asset(sym, ticker, prev_state)
-
-    deep_results = []
-    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT) as pool:
-        for res in pool.map(deep, deep_targets):
-            if res is not None:
-                deep_results.append(res)
+    results = await asyncio.gather(*(
+        analyze_asset(sym, ticker, premium_map.get(sym) if premium_map else None, prev_state)
+        for sym, _, _, ticker in deep_targets
+    ))
+    deep_results = [res for res in results if res is not None]
 
     deep_dived   = len(deep_results)
     disqualified = assets_scanned - len(deep_results)
@@ -618,11 +1101,12 @@ def main():
                 "finalScore": opp["_finalScore"],
                 "scanStreak": opp["scanStreak"],
             }
-    save_state(new_state)
+    if persist:
+        save_state(new_state)
 
     # --- BTC context ---
     btc = ticker_map.get("BTCUSDT", {})
-    btc_klines = fetch_klines("BTCUSDT", "1h", 3)
+    btc_klines = await fetch_klines("BTCUSDT", "1h", 3)
     btc_trend  = "FLAT"
     btc_chg_1h = 0.0
     if btc_klines:
@@ -641,7 +1125,7 @@ def main():
     # Strip internal fields
     clean = [{k: v for k, v in o.items() if not k.startswith("_")} for o in top_opps]
 
-    output = {
+    return {
         "scanTime":      scan_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
         "assetsScanned": assets_scanned,
         "passedStage1":  passed_stage1,
@@ -652,8 +1136,435 @@ def main():
         "opportunities": clean,
     }
 
-    print(json.dumps(output, default=str))
+
+# ---------------------------------------------------------------------------
+# Daemon mode
+# ---------------------------------------------------------------------------
+
+def log(msg):
+    print(f"[opportunity-scan] {msg}", file=sys.stderr, flush=True)
+
+
+def _premium_row(event):
+    """markPriceUpdate stream event -> /fapi/v1/premiumIndex row."""
+    return {
+        "symbol":          event["s"],
+        "markPrice":       event["p"],
+        "indexPrice":      event.get("i"),
+        "lastFundingRate": event.get("r"),
+        "nextFundingTime": event.get("T"),
+        "time":            event.get("E"),
+    }
+
+
+class Subscription:
+    """One combined-stream connection's stream names. Changes while it is
+    connected go out as SUBSCRIBE / UNSUBSCRIBE requests on the open socket;
+    a reconnect starts from the current names."""
+
+    def __init__(self, names):
+        self.names = set(names)
+        self.changes = asyncio.Queue()   # (method, [names]) not yet sent
+        self.task = None
+
+    def update(self, method, names):
+        if method == "SUBSCRIBE":
+            self.names.update(names)
+        else:
+            self.names.difference_update(names)
+        self.changes.put_nowait((method, sorted(names)))
+
+    def pending_changes(self):
+        """Drain the changes queue; on (re)connect the URL already has them."""
+        while not self.changes.empty():
+            self.changes.get_nowait()
+
+
+class BinanceStreams:
+    """Combined-stream connections to Binance Futures."""
+
+    def __init__(self):
+        try:
+            import websockets
+        except ImportError:
+            print(json.dumps({"error": "websockets library not installed. Run: pip install websockets"}))
+            sys.exit(1)
+        self.websockets = websockets
+
+    async def messages(self, sub):
+        sub.pending_changes()
+        async with self.websockets.connect(WS_URL + "/".join(sorted(sub.names)), ping_interval=60,
+                                           max_size=None) as ws:
+            async def send_changes():
+                request_id = 0
+                while True:
+                    method, names = await sub.changes.get()
+                    request_id += 1
+                    await ws.send(json.dumps({"method": method, "params": names, "id": request_id}))
+
+            sender = asyncio.create_task(send_changes())
+            try:
+                async for raw in ws:
+                    yield json.loads(raw)   # request acks ({"result", "id"}) carry no data
+            finally:
+                sender.cancel()
+
+
+class StubBinance:
+    """Offline stand-in for Binance (--stub): a random-walk market served as
+    REST through httpx.MockTransport and as combined-stream messages, both
+    from the same state, so daemon mode can be exercised without network."""
+
+    def __init__(self, n_symbols=80, seed=7, tick=0.25):
+        import random
+        self.rng = random.Random(seed)
+        self.tick = tick
+        self.symbols = ["BTCUSDT"] + [f"STUB{i}USDT" for i in range(n_symbols)]
+        self.price = {s: self.rng.uniform(0.5, 500) for s in self.symbols}
+        self.volume = {s: self.rng.uniform(5e7, 2e9) for s in self.symbols}
+        self.bars = {}     # (symbol, interval) -> [[t, o, h, l, c, v], ...], last one open
+
+    def _series(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self.bars:
+            # Walk backwards from the current price so every interval agrees
+            step = INTERVAL_MS[interval]
+            now = int(time.time() * 1000) // step * step
+            c = self.price[symbol]
+            bars = []
+            for i in range(KLINE_CACHE_BARS):
+                o = c / (1 + self.rng.gauss(0, 0.008))
+                h, l = max(o, c) * (1 + abs(self.rng.gauss(0, 0.003))), min(o, c) * (1 - abs(self.rng.gauss(0, 0.003)))
+                bars.append([now - i * step, o, h, l, c, self.rng.uniform(1e3, 1e5)])
+                c = o
+            self.bars[key] = bars[::-1]
+        return self.bars[key]
+
+    def _advance(self, symbol):
+        """One price tick for `symbol`; returns (interval, bar, closed) updates."""
+        p = self.price[symbol] = self.price[symbol] * (1 + self.rng.gauss(0, 0.0015))
+        now = int(time.time() * 1000)
+        updates = []
+        for interval, step in INTERVAL_MS.items():
+            bars = self._series(symbol, interval)
+            if now // step * step > bars[-1][0]:
+                updates.append((interval, list(bars[-1]), True))
+                bars.append([now // step * step, p, p, p, p, 0.0])
+            bar = bars[-1]
+            bar[2], bar[3], bar[4] = max(bar[2], p), min(bar[3], p), p
+            bar[5] += self.rng.uniform(1, 100)
+            updates.append((interval, list(bar), False))
+        return updates
+
+    def handler(self, request):
+        path, q = request.url.path, dict(request.url.params)
+        if path == "/fapi/v1/ticker/24hr":
+            body = [{"symbol": s, "lastPrice": str(self.price[s]), "quoteVolume": str(self.volume[s]),
+                     "priceChangePercent": str(round(self.rng.uniform(-8, 8), 2))} for s in self.symbols]
+        elif path == "/fapi/v1/premiumIndex":
+            rows = [{"symbol": s, "markPrice": str(self.price[s]), "indexPrice": str(self.price[s]),
+                     "lastFundingRate": str(round(self.rng.uniform(-0.0005, 0.0008), 6))} for s in self.symbols]
+            body = next((r for r in rows if r["symbol"] == q["symbol"]), {}) if "symbol" in q else rows
+        elif path == "/fapi/v1/klines":
+            bars = self._series(q["symbol"], q["interval"])
+            if "startTime" in q:
+                bars = [b for b in bars if b[0] >= int(q["startTime"])][:int(q["limit"])]
+            else:
+                bars = bars[-int(q.get("limit", 500)):]
+            body = [[b[0]] + [str(x) for x in b[1:]] for b in bars]
+        elif path == "/futures/data/topLongShortPositionRatio":
+            body = [{"longShortRatio": str(round(self.rng.uniform(0.6, 2.2), 3))}]
+        elif path == "/futures/data/takerlongshortRatio":
+            body = [{"buySellRatio": str(round(self.rng.uniform(0.7, 1.4), 3))}]
+        elif path == "/futures/data/openInterestHist":
+            body = [{"sumOpenInterestValue": str(self.rng.uniform(1e7, 1e9))} for _ in range(5)]
+        else:
+            return httpx.Response(404, json={"msg": "not stubbed"})
+        return httpx.Response(200, json=body, headers={"X-MBX-USED-WEIGHT-1M": "1"})
+
+    async def messages(self, sub):
+        sub.pending_changes()
+        last_mark = 0.0
+        request_id = 0
+        while True:
+            await asyncio.sleep(self.tick)
+            while not sub.changes.empty():
+                sub.changes.get_nowait()
+                request_id += 1
+                yield {"result": None, "id": request_id}
+            klines = {}
+            for name in sub.names:
+                if "@kline_" in name:
+                    sym, interval = name.split("@kline_")
+                    klines.setdefault(sym.upper(), []).append(interval)
+            mark_stream = "!markPrice@arr@1s" in sub.names
+            for sym in self.rng.sample(sorted(klines), min(len(klines), 8)):
+                for interval, bar, closed in self._advance(sym):
+                    if interval in klines[sym]:
+                        yield {"stream": f"{sym.lower()}@kline_{interval}", "data": {
+                            "e": "kline", "s": sym, "k": {
+                                "t": bar[0], "i": interval, "o": str(bar[1]), "h": str(bar[2]),
+                                "l": str(bar[3]), "c": str(bar[4]), "v": str(bar[5]), "x": closed}}}
+            if mark_stream and time.time() - last_mark >= 1:
+                last_mark = time.time()
+                yield {"stream": "!markPrice@arr@1s", "data": [
+                    {"e": "markPriceUpdate", "E": int(last_mark * 1000), "s": s, "p": str(self.price[s]),
+                     "i": str(self.price[s]), "r": "0.0001", "T": 0} for s in self.symbols]}
+
+
+class Daemon:
+    """Keeps the scanner's inputs warm and republishes its output.
+
+    Candles come from kline streams for every stage-1 symbol (plus BTC) into
+    the shared KlineCache; funding and mark prices from the all-market
+    markPrice stream; 24h tickers from a bulk pull every TICKER_REFRESH.
+    scan() then runs from memory. Scheduled scans advance the scan streak;
+    event-driven ones (bar closes, large mark moves on listed
+    opportunities) republish without touching it."""
+
+    def __init__(self, interval, output=None, socket_path=None, source=None):
+        self.interval = interval
+        self.output = output
+        self.socket_path = socket_path
+        self.source = source or BinanceStreams()
+        self.tickers = None
+        self.premium = {}
+        self.watch = set()
+        self.snapshot = None
+        self.scored_marks = {}     # symbol -> mark price when last listed
+        self.subscribers = {}      # socket writer -> queue of snapshots to send
+        self.trigger = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.subscriptions = []    # Subscription per combined-stream connection
+        self.last_event_scan = 0.0
+
+    # --- inputs ---
+
+    async def market(self):
+        if self.tickers is None:
+            await self.refresh_tickers()
+        if self.premium:
+            return self.tickers, self.premium
+        # markPrice stream not up yet: one bulk pull
+        return self.tickers, (await fetch_market())[1]
+
+    async def refresh_tickers(self):
+        tickers = await get_json("/fapi/v1/ticker/24hr")
+        if tickers and isinstance(tickers, list):
+            self.tickers = tickers
+            watch = {sym for sym, _ in stage1_filter(tickers)} | {"BTCUSDT"}
+            if watch != self.watch:
+                self.watch = watch
+                self.resubscribe()
+
+    async def ticker_loop(self):
+        while True:
+            await asyncio.sleep(TICKER_REFRESH)
+            await self.refresh_tickers()
+
+    def resubscribe(self):
+        """Move the open connections to the new watch set: unsubscribe what
+        left, subscribe what joined where there is room, and only open a new
+        connection for the overflow. Nothing reconnects."""
+        wanted = {f"{sym.lower()}@kline_{interval}" for sym in self.watch for interval in INTERVAL_MS}
+        wanted.add("!markPrice@arr@1s")
+        current = set().union(*(sub.names for sub in self.subscriptions))
+        removed, added = current - wanted, sorted(wanted - current)
+        for sub in self.subscriptions:
+            gone = sub.names & removed
+            if gone:
+                sub.update("UNSUBSCRIBE", gone)
+        for sub in self.subscriptions:
+            room = STREAMS_PER_CONNECTION - len(sub.names)
+            if added and room > 0:
+                sub.update("SUBSCRIBE", added[:room])
+                added = added[room:]
+        for i in range(0, len(added), STREAMS_PER_CONNECTION):
+            sub = Subscription(added[i:i + STREAMS_PER_CONNECTION])
+            sub.task = asyncio.create_task(self.stream(sub))
+            self.subscriptions.append(sub)
+        for sub in [sub for sub in self.subscriptions if not sub.names]:
+            sub.task.cancel()
+            self.subscriptions.remove(sub)
+        log(f"watching {len(wanted)} streams over {len(self.subscriptions)} connection(s) "
+            f"(+{len(wanted - current)} / -{len(removed)})")
+
+    async def stream(self, sub):
+        delay = 1
+        while True:
+            try:
+                async for msg in self.source.messages(sub):
+                    delay = 1
+                    self.on_message(msg.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log(f"stream error: {e}; reconnecting in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def on_message(self, data):
+        if isinstance(data, list):
+            for event in data:
+                if event.get("e") == "markPriceUpdate":
+                    self.on_mark(event)
+        elif data and data.get("e") == "kline":
+            k = data["k"]
+            bar = [int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"])]
+            if KLINES.apply(data["s"], k["i"], bar, bool(k["x"])) and k["i"] in ("15m", "1h"):
+                self.trigger.set()
+
+    def on_mark(self, event):
+        sym = event["s"]
+        self.premium[sym] = _premium_row(event)
+        scored = self.scored_marks.get(sym)
+        if scored:
+            move = abs(float(event["p"]) - scored) / scored * 100
+            if move >= EVENT_MOVE_PCT:
+                self.scored_marks.pop(sym)
+                self.trigger.set()
+
+    # --- scoring + publishing ---
+
+    async def rescore(self, reason):
+        async with self.lock:
+            start = time.perf_counter()
+            output = await scan(self.market, persist=reason == "schedule")
+            if output is None:
+                log(f"{reason} scan failed: no tickers")
+                return
+            elapsed = (time.perf_counter() - start) * 1000
+            self.scored_marks = {}
+            for opp in output["opportunities"]:
+                row = self.premium.get(opp["asset"] + "USDT")
+                if row:
+                    self.scored_marks[opp["asset"] + "USDT"] = float(row["markPrice"])
+            self.publish(json.dumps(output, default=str))
+            log(f"{reason} scan {elapsed:.0f} ms, {HTTP.requests} HTTP requests so far, "
+                f"{len(output['opportunities'])} opportunities")
+
+    def publish(self, snapshot):
+        self.snapshot = snapshot
+        if self.output:
+            tmp = self.output + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(snapshot)
+            os.replace(tmp, self.output)
+        for writer, queue in list(self.subscribers.items()):
+            try:
+                queue.put_nowait(snapshot)
+            except asyncio.QueueFull:
+                log("dropping socket client that fell behind")
+                self.subscribers.pop(writer, None)
+                writer.transport.abort()
+
+    async def on_client(self, reader, writer):
+        """Socket clients get the latest snapshot, then one line per new one.
+        Each client is fed from its own small queue and must take a snapshot
+        within CLIENT_DRAIN_TIMEOUT, so a stalled reader is dropped instead of
+        buffering without bound or holding up publish()."""
+        queue = asyncio.Queue(maxsize=CLIENT_BACKLOG)
+        if self.snapshot:
+            queue.put_nowait(self.snapshot)
+        self.subscribers[writer] = queue
+        closed = asyncio.ensure_future(self.discard_input(reader))   # completes when the client disconnects
+        try:
+            while True:
+                get = asyncio.ensure_future(queue.get())
+                await asyncio.wait({get, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    break
+                writer.write(get.result().encode() + b"\n")
+                await asyncio.wait_for(writer.drain(), CLIENT_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            log("dropping socket client that stopped reading")
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.pop(writer, None)
+            closed.cancel()
+            writer.close()
+
+    @staticmethod
+    async def discard_input(reader):
+        """Read and drop whatever a client sends, in small chunks, until EOF."""
+        while await reader.read(4096):
+            pass
+
+    async def schedule_loop(self):
+        while True:
+            await self.rescore("schedule")
+            KLINES.save()
+            await asyncio.sleep(self.interval)
+
+    async def event_loop(self):
+        while True:
+            await self.trigger.wait()
+            await asyncio.sleep(max(EVENT_DEBOUNCE, self.last_event_scan + EVENT_MIN_GAP - time.time()))
+            self.trigger.clear()
+            self.last_event_scan = time.time()
+            await self.rescore("event")
+
+    async def run(self):
+        server = None
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            server = await asyncio.start_unix_server(self.on_client, self.socket_path)
+        await self.refresh_tickers()
+        tasks = [asyncio.create_task(t) for t in (self.ticker_loop(), self.schedule_loop(), self.event_loop())]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks + [sub.task for sub in self.subscriptions]:
+                task.cancel()
+            if server:
+                server.close()
+
+
+async def run_daemon(args):
+    global HTTP, KLINES, KLINE_OPEN_TTL, SIGNAL_TTL, STATE_FILE
+    KLINE_OPEN_TTL = DAEMON_OPEN_TTL
+    SIGNAL_TTL = DAEMON_SIGNAL_TTL
+    if args.stub and httpx is None:
+        print(json.dumps({"error": "--stub needs httpx. Run: pip install httpx"}))
+        sys.exit(1)
+    stub = StubBinance() if args.stub else None
+    if stub:
+        STATE_FILE = os.devnull   # a synthetic market must not touch the real streak state
+    HTTP = BinanceHttp(transport=httpx.MockTransport(stub.handler) if stub else None)
+    KLINES = KlineCache(os.devnull if stub else None)
+    KLINES.load()
+    daemon = Daemon(args.interval, args.output, args.socket, source=stub)
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    log(f"daemon started{' (stub market)' if stub else ''}, scan every {args.interval}s")
+    try:
+        await daemon.run()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await HTTP.close()
+        KLINES.save()
+        log("daemon stopped")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Binance Futures opportunity scanner")
+    parser.add_argument("--daemon", action="store_true",
+                        help="stay resident: keep candles warm from streams and re-score continuously")
+    parser.add_argument("--interval", type=float, default=300,
+                        help="daemon: seconds between scheduled scans (these advance the scan streak)")
+    parser.add_argument("--output", help="daemon: write each snapshot to this file (atomic replace)")
+    parser.add_argument("--socket", help="daemon: serve snapshots as JSON lines on this Unix socket")
+    parser.add_argument("--stub", action="store_true",
+                        help="daemon: run against an in-process synthetic market instead of Binance")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    asyncio.run(run_daemon(args) if args.daemon else main())